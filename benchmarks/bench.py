@@ -0,0 +1,396 @@
+"""
+Performance benchmarks for the EVLinkHA integration.
+
+Runs against the local stand-in backend (benchmarks/standin.py) and an
+in-process Home Assistant core; requires `homeassistant` and `aiohttp`.
+
+  python -m benchmarks.bench                 # JSON to stdout
+  python -m benchmarks.bench -o bench.json   # JSON to a file
+  python -m benchmarks.bench --only client   # one group
+
+Every result is {"name", "unit", "value", ...extra}; compare runs by name.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.evlinkha import _handle_push_webhook, _route_push
+from custom_components.evlinkha.api import (
+    EVLinkHAClient, EVLinkHAStream, RateLimiter, RATE_LIMITERS,
+    async_acquire_session, async_release_session,
+)
+from custom_components.evlinkha.const import DOMAIN, HTTP_REUSE_TTL, VEHICLE_FIELDS
+from custom_components.evlinkha.coordinator import EVLinkHAVehicleCoordinator
+from custom_components.evlinkha.helpers.fields import FieldAccessor
+from custom_components.evlinkha.helpers.merge import deep_merge
+from custom_components.evlinkha.model import parse_status
+from custom_components.evlinkha.push import PushCoalescer
+from custom_components.evlinkha.sensor import EVLinkHAVehicleSensor
+
+from .standin import StandInServer, make_vehicle_status
+
+API_KEY = "bench-key"
+
+
+def _percentiles(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+    return {"p50": pct(50), "p95": pct(95), "p99": pct(99), "mean": statistics.fmean(samples)}
+
+
+async def _make_hass(config_dir: str) -> HomeAssistant:
+    hass = HomeAssistant(config_dir)
+    try:
+        from homeassistant.helpers import frame
+        frame.async_setup(hass)
+    except Exception:  # older cores do not need it
+        pass
+    # The client-side limiter would otherwise pace the benchmark itself
+    hass.data.setdefault(DOMAIN, {})[RATE_LIMITERS] = {
+        API_KEY: RateLimiter(rate_per_minute=10**9, burst=10**9),
+    }
+    return hass
+
+
+class _Request:
+    """Just enough of aiohttp's request for _handle_push_webhook."""
+
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+
+async def bench_client(hass, requests: int, concurrency: int, latency: float) -> list[dict]:
+    """EVLinkHAClient request throughput and latency against the stand-in."""
+    results = []
+    for etag in (False, True):
+        server = await StandInServer(vehicles=concurrency, latency=latency, etag=etag).start()
+        session = async_acquire_session(hass, server.base_url)
+        client = EVLinkHAClient(hass, API_KEY, server.base_url, "veh-0", session=session)
+        # Measure the request path, not responses reused from the previous lap
+        client.flights.ttl = 0
+        vehicle_ids = list(server.vehicles)
+        latencies: list[float] = []
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with sem:
+                start = time.perf_counter()
+                await client.async_get_vehicle_status(vehicle_ids[i % len(vehicle_ids)])
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        await async_release_session(hass, server.base_url)
+        await server.stop()
+
+        label = "etag" if etag else "no_etag"
+        results.append({
+            "name": f"client.status.throughput.{label}", "unit": "req/s",
+            "value": requests / elapsed, "requests": requests, "concurrency": concurrency,
+            "server_latency_s": latency, "not_modified": server.not_modified,
+        })
+        results.append({
+            "name": f"client.status.latency.{label}", "unit": "s",
+            "value": _percentiles(latencies)["p50"], **_percentiles(latencies),
+        })
+        client.flights.ttl = HTTP_REUSE_TTL
+
+    # A burst of identical status calls from several clients of one API key
+    server = await StandInServer(vehicles=1, latency=latency).start()
+    session = async_acquire_session(hass, server.base_url)
+    clients = [
+        EVLinkHAClient(hass, API_KEY, server.base_url, "veh-0", session=session) for _ in range(4)
+    ]
+    before = dict(clients[0].flights.stats)
+    start = time.perf_counter()
+    await asyncio.gather(*(clients[i % 4].async_get_vehicle_status() for i in range(concurrency * 4)))
+    elapsed = time.perf_counter() - start
+    await async_release_session(hass, server.base_url)
+    await server.stop()
+    results.append({
+        "name": "client.status.burst_requests_sent", "unit": "count",
+        "value": sum(server.requests.values()), "calls": concurrency * 4, "elapsed_s": elapsed,
+        **{k: v - before[k] for k, v in clients[0].flights.stats.items()},
+    })
+    return results
+
+
+def bench_merge(iterations: int) -> list[dict]:
+    """Push merge cost for small and large states, raw dicts and VehicleState."""
+    results = []
+    push = {"chargeState": {"batteryLevel": 80, "chargeRate": 11.0, "isCharging": True}}
+    for extra in (0, 50_000):
+        raw = make_vehicle_status("veh-0", 0, extra_bytes=extra)
+        # Many unrelated subtrees, to show cost does not follow state size
+        raw["history"] = {f"k{i}": {"v": i} for i in range(2000 if extra else 0)}
+        size = "large" if extra else "small"
+        for kind, state, merge in (
+            ("merge", raw, deep_merge),
+            ("merge_model", parse_status(raw), lambda state, patch: state.merge(patch)),
+        ):
+            samples = []
+            for i in range(iterations):
+                patch = copy.deepcopy(push)
+                patch["chargeState"]["batteryLevel"] = i % 100
+                start = time.perf_counter()
+                merge(state, patch)
+                samples.append(time.perf_counter() - start)
+            results.append({
+                "name": f"push.{kind}.{size}_state", "unit": "s",
+                "value": _percentiles(samples)["p50"], **_percentiles(samples),
+                "state_top_level_keys": len(raw),
+            })
+    return results
+
+
+def bench_model(vehicles: int, reads: int) -> list[dict]:
+    """Memory per vehicle and hot-path field reads: raw status dicts vs VehicleState."""
+    payloads = [json.dumps(make_vehicle_status(f"veh-{i}", i)) for i in range(vehicles)]
+    results = []
+    states = {}
+    for kind, load in (("dict", json.loads), ("model", lambda p: parse_status(json.loads(p)))):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        states[kind] = [load(p) for p in payloads]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results.append({
+            "name": f"model.memory_per_vehicle.{kind}", "unit": "bytes",
+            "value": used / vehicles, "vehicles": vehicles,
+        })
+
+    # Parsing a polled status, with and without the static tier's blocks reused
+    decoded = json.loads(payloads[0])
+    previous = parse_status(decoded)
+    for kind, static in (("full", None), ("static_reuse", previous)):
+        start = time.perf_counter()
+        for _ in range(reads // 100):
+            parse_status(decoded, static)
+        results.append({
+            "name": f"model.parse.{kind}", "unit": "s",
+            "value": (time.perf_counter() - start) / (reads // 100),
+        })
+
+    accessor = FieldAccessor("chargeState.isCharging")
+    for kind, read in (
+        ("dict", lambda s: (s.get("chargeState") or {}).get("isCharging")),
+        ("accessor", accessor),
+        ("model", lambda s: s.charge_state.is_charging),
+    ):
+        status = states["dict" if kind == "dict" else "model"][0]
+        start = time.perf_counter()
+        for _ in range(reads):
+            read(status)
+        results.append({
+            "name": f"model.read.{kind}", "unit": "s",
+            "value": (time.perf_counter() - start) / reads, "reads": reads,
+        })
+    return results
+
+
+async def bench_push(hass, pushes: int, window: float) -> list[dict]:
+    """End-to-end latency from webhook call to coordinator data."""
+    client = EVLinkHAClient(hass, API_KEY, "http://127.0.0.1:9", "veh-0")
+    coord = EVLinkHAVehicleCoordinator(hass, client, ["veh-0"], update_interval=_minutes(6))
+    coord.async_set_updated_data({"veh-0": parse_status(make_vehicle_status("veh-0"))})
+    webhook_id = "bench-webhook"
+    hass.data[DOMAIN][f"{webhook_id}_vehicle"] = coord
+    push = PushCoalescer(hass, coord, window=window)
+    hass.data[DOMAIN][f"{webhook_id}_push"] = push
+
+    applied = asyncio.Event()
+    unsub = coord.async_add_listener(applied.set)
+    handler_s, e2e_s = [], []
+    for i in range(pushes):
+        applied.clear()
+        payload = {"vehicle": {"vehicleId": "veh-0", "chargeState": {"batteryLevel": i % 100 + 1}}}
+        start = time.perf_counter()
+        await _handle_push_webhook(hass, webhook_id, _Request(payload))
+        handler_s.append(time.perf_counter() - start)
+        await asyncio.wait_for(applied.wait(), timeout=window + 5)
+        e2e_s.append(time.perf_counter() - start)
+    unsub()
+    push.async_shutdown()
+    await coord.async_shutdown()
+
+    return [
+        {"name": f"push.handler.window_{window}", "unit": "s",
+         "value": _percentiles(handler_s)["p50"], **_percentiles(handler_s)},
+        {"name": f"push.end_to_end.window_{window}", "unit": "s",
+         "value": _percentiles(e2e_s)["p50"], **_percentiles(e2e_s)},
+        {"name": f"push.stats.window_{window}", "unit": "count", "value": push.stats["flushes"], **push.stats},
+    ]
+
+
+async def bench_stream(hass, events: int) -> list[dict]:
+    """Latency from a stand-in stream event to coordinator data, incl. one resume."""
+    server = await StandInServer(vehicles=1, stream_heartbeat=1).start()
+    session = async_acquire_session(hass, server.base_url)
+    client = EVLinkHAClient(hass, API_KEY, server.base_url, "veh-0", session=session)
+    coord = EVLinkHAVehicleCoordinator(hass, client, ["veh-0"], update_interval=_minutes(6))
+    coord.async_set_updated_data({"veh-0": parse_status(make_vehicle_status("veh-0"))})
+    entry_id = "bench-stream"
+    hass.data[DOMAIN][f"{entry_id}_vehicle"] = coord
+    push = PushCoalescer(hass, coord, window=0)
+    hass.data[DOMAIN][f"{entry_id}_push"] = push
+
+    healthy = asyncio.Event()
+
+    def _on_health(ok: bool) -> None:
+        coord.async_set_streaming(ok)
+        if ok:
+            healthy.set()
+
+    stream = EVLinkHAStream(
+        client, lambda data: _route_push(hass, entry_id, data), _on_health, backoff_base=0.05,
+    )
+    task = hass.async_create_background_task(stream.async_run(), "bench stream")
+    await asyncio.wait_for(healthy.wait(), timeout=5)
+
+    applied = asyncio.Event()
+    unsub = coord.async_add_listener(applied.set)
+    samples = []
+    for i in range(events):
+        applied.clear()
+        start = time.perf_counter()
+        server.publish("veh-0", {"chargeState": {"batteryLevel": i % 100 + 1}})
+        await asyncio.wait_for(applied.wait(), timeout=5)
+        samples.append(time.perf_counter() - start)
+
+    # Drop the stream with an event in between; it must be replayed
+    healthy.clear()
+    applied.clear()
+    server.drop_streams()
+    server.publish("veh-0", {"chargeState": {"batteryLevel": 42}})
+    start = time.perf_counter()
+    await asyncio.wait_for(applied.wait(), timeout=10)
+    resume_s = time.perf_counter() - start
+    resumed = coord.vehicle_data("veh-0")["chargeState"]["batteryLevel"] == 42
+
+    unsub()
+    task.cancel()
+    await stream.async_stop()
+    push.async_shutdown()
+    await coord.async_shutdown()
+    await async_release_session(hass, server.base_url)
+    await server.stop()
+
+    return [
+        {"name": "stream.end_to_end", "unit": "s",
+         "value": _percentiles(samples)["p50"], **_percentiles(samples)},
+        {"name": "stream.resume", "unit": "s", "value": resume_s,
+         "replayed": resumed, **stream.stats},
+    ]
+
+
+async def bench_sensors(hass, updates: int, vehicles: int) -> list[dict]:
+    """State evaluation cost of all vehicle sensors per coordinator update."""
+    client = EVLinkHAClient(hass, API_KEY, "http://127.0.0.1:9", "veh-0")
+    vehicle_ids = [f"veh-{i}" for i in range(vehicles)]
+    coord = EVLinkHAVehicleCoordinator(
+        hass, client, vehicle_ids, update_interval=_minutes(6), fleet=vehicles > 1,
+    )
+    entry = SimpleNamespace(entry_id="bench-entry")
+    sensors = [
+        EVLinkHAVehicleSensor(coord, entry, vid, field, label, unit)
+        for vid in vehicle_ids
+        for field, (label, unit) in VEHICLE_FIELDS.items()
+    ]
+    base = {vid: parse_status(make_vehicle_status(vid, i)) for i, vid in enumerate(vehicle_ids)}
+
+    samples = []
+    for n in range(updates):
+        data = dict(base)
+        # One vehicle changes per update, as with a push or a partial poll
+        vid = vehicle_ids[n % vehicles]
+        data[vid], _ = base[vid].merge({"chargeState": {"batteryLevel": n % 100}})
+        start = time.perf_counter()
+        coord.async_set_updated_data(data)
+        for sensor in sensors:
+            sensor.state
+        samples.append(time.perf_counter() - start)
+    await coord.async_shutdown()
+
+    return [{
+        "name": f"sensors.state_per_update.{vehicles}_vehicles", "unit": "s",
+        "value": _percentiles(samples)["p50"], **_percentiles(samples), "sensors": len(sensors),
+    }]
+
+
+def _minutes(n):
+    from datetime import timedelta
+    return timedelta(minutes=n)
+
+
+async def run(args) -> dict:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _make_hass(config_dir)
+        groups = set(args.only or ["client", "merge", "model", "push", "stream", "sensors"])
+        if "client" in groups:
+            results += await bench_client(hass, args.requests, args.concurrency, args.latency)
+        if "merge" in groups:
+            results += bench_merge(args.iterations)
+        if "model" in groups:
+            results += bench_model(200, args.iterations * 20)
+        if "push" in groups:
+            results += await bench_push(hass, args.pushes, 0)
+            results += await bench_push(hass, max(1, args.pushes // 20), 0.05)
+        if "stream" in groups:
+            results += await bench_stream(hass, max(1, args.pushes // 5))
+        if "sensors" in groups:
+            results += await bench_sensors(hass, args.updates, 1)
+            results += await bench_sensors(hass, args.updates, 40)
+        await hass.async_stop(force=True)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--only", action="append", choices=["client", "merge", "model", "push", "stream", "sensors"])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="stand-in latency, seconds")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--pushes", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=500)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
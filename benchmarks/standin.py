@@ -0,0 +1,286 @@
+"""
+Local stand-in for the EVLinkHA backend, for benchmarks and manual testing.
+
+Serves the endpoints EVLinkHAClient talks to:
+
+  GET  /api/v1/ha/me
+  GET  /api/v1/ha/vehicles
+  GET  /api/v1/ha/status/{vehicle_id}
+  POST /api/v1/ha/charging/{vehicle_id}
+  GET  /api/v1/ha/stream                  (server-sent events)
+
+Latency, error injection (429/400/5xx) and payload size are configurable.
+Status responses carry an ETag and honour If-None-Match.
+
+The stream sends every publish() as an event with an increasing id,
+a `:` heartbeat comment every `stream_heartbeat` seconds, and replays
+the events after Last-Event-ID on reconnect. drop_streams() cuts all
+open streams to exercise reconnects.
+
+Run standalone:
+  python -m benchmarks.standin --port 8765 --vehicles 5 --latency 0.05
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web
+
+
+def make_vehicle_status(vehicle_id: str, index: int = 0, extra_bytes: int = 0) -> dict:
+    """A status payload shaped like /api/v1/ha/status/{id}."""
+    status = {
+        "vehicleId": vehicle_id,
+        "vehicleName": f"Vehicle {index}",
+        "chargingState": "IDLE",
+        "lastSeen": "2025-07-01T12:00:00Z",
+        "isReachable": True,
+        "vendor": "XPENG",
+        "chargeState": {
+            "batteryLevel": 55 + index % 40,
+            "batteryCapacity": 78.2,
+            "chargeLimit": 90,
+            "powerDeliveryState": "UNPLUGGED",
+            "chargeRate": None,
+            "chargeTimeRemaining": None,
+            "isPluggedIn": False,
+            "isCharging": False,
+            "range": 310,
+        },
+        "information": {
+            "displayName": f"Vehicle {index}",
+            "vin": f"LVX{index:014d}",
+            "brand": "XPENG",
+            "model": "G6",
+            "year": 2024,
+        },
+        "location": {"latitude": 59.3293 + index * 0.001, "longitude": 18.0686},
+        "odometer": {"distance": 12000 + index},
+        "smartChargingPolicy": {"isEnabled": False, "minimumChargeLimit": 20},
+        "capabilities": {
+            key: {"isCapable": True}
+            for key in ("chargeState", "information", "location", "odometer", "smartChargingPolicy")
+        },
+    }
+    if extra_bytes:
+        # Unknown fields the integration must carry along untouched
+        status["extra"] = {"blob": "x" * extra_bytes}
+    return status
+
+
+class StandInServer:
+    """
+    In-process EVLinkHA backend.
+
+    Args:
+      vehicles: number of vehicles on the account.
+      latency: seconds added to every response (plus uniform `jitter`).
+      rate_429 / rate_400 / rate_5xx: probability of answering with that error.
+      retry_after: Retry-After header value sent with 429s (None = omit).
+      extra_bytes: padding added to every status payload.
+      etag: send ETags and answer If-None-Match with 304.
+      stream_heartbeat: seconds between heartbeat comments on the stream.
+    """
+
+    def __init__(
+        self,
+        vehicles: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        rate_400: float = 0.0,
+        rate_5xx: float = 0.0,
+        retry_after: float | None = 1,
+        extra_bytes: int = 0,
+        etag: bool = True,
+        api_key: str = "bench-key",
+        seed: int | None = None,
+        stream_heartbeat: float = 15.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_400 = rate_400
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.etag = etag
+        self.api_key = api_key
+        self._random = random.Random(seed)
+        self.vehicles = {
+            f"veh-{i}": make_vehicle_status(f"veh-{i}", i, extra_bytes) for i in range(vehicles)
+        }
+        self.requests: dict[str, int] = {}
+        self.not_modified = 0
+        self.stream_heartbeat = stream_heartbeat
+        self._events: list[tuple[int, str]] = []    # (id, JSON data), replayed on resume
+        self._streams: set[asyncio.Queue] = set()
+        self._runner = None
+        self.port = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/v1/ha/me", self._me)
+        app.router.add_get("/api/v1/ha/vehicles", self._vehicles)
+        app.router.add_get("/api/v1/ha/status/{vehicle_id}", self._status)
+        app.router.add_post("/api/v1/ha/charging/{vehicle_id}", self._charging)
+        app.router.add_get("/api/v1/ha/stream", self._stream)
+        return app
+
+    async def start(self, port: int = 0) -> "StandInServer":
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self.drop_streams()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if request.headers.get("X-API-Key") != self.api_key:
+            return web.json_response({"detail": "Invalid API key"}, status=401)
+
+        roll = self._random.random()
+        if roll < self.rate_429:
+            headers = {"X-RateLimit-Remaining": "0"}
+            if self.retry_after is not None:
+                headers["Retry-After"] = str(self.retry_after)
+            return web.json_response({"detail": "Too many requests"}, status=429, headers=headers)
+        roll -= self.rate_429
+        if roll < self.rate_400:
+            return web.json_response({"detail": "Bad request"}, status=400)
+        roll -= self.rate_400
+        if roll < self.rate_5xx:
+            return web.json_response({"detail": "Backend error"}, status=502)
+        return await handler(request)
+
+    def _json(self, request, payload) -> web.Response:
+        body = json.dumps(payload).encode()
+        if not self.etag:
+            return web.Response(body=body, content_type="application/json")
+        tag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == tag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": tag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": tag})
+
+    async def _me(self, request):
+        return self._json(request, {
+            "tier": "pro", "email": "bench@example.com", "name": "Bench",
+            "role": "user", "sms_credits": 10,
+        })
+
+    async def _vehicles(self, request):
+        return web.json_response([
+            {"vehicleId": vid, "vehicleName": status["vehicleName"]}
+            for vid, status in self.vehicles.items()
+        ])
+
+    async def _status(self, request):
+        status = self.vehicles.get(request.match_info["vehicle_id"])
+        if status is None:
+            return web.json_response({"detail": "Unknown vehicle"}, status=400)
+        return self._json(request, status)
+
+    async def _charging(self, request):
+        status = self.vehicles.get(request.match_info["vehicle_id"])
+        if status is None:
+            return web.json_response({"detail": "Unknown vehicle"}, status=400)
+        action = (await request.json()).get("action")
+        if action not in ("START", "STOP"):
+            return web.json_response({"detail": "Invalid action"}, status=400)
+        charging = action == "START"
+        status["chargingState"] = "CHARGING" if charging else "IDLE"
+        status["chargeState"] = {**status["chargeState"], "isCharging": charging}
+        return web.json_response({"id": f"act-{time.monotonic_ns()}", "state": "PENDING", "kind": action})
+
+    def publish(self, vehicle_id: str, patch: dict) -> int:
+        """Apply a partial update and send it to every open stream; returns the event id."""
+        status = self.vehicles[vehicle_id]
+        for key, value in patch.items():
+            if isinstance(value, dict) and isinstance(status.get(key), dict):
+                status[key] = {**status[key], **value}
+            else:
+                status[key] = value
+        event_id = len(self._events) + 1
+        data = json.dumps({"vehicleId": vehicle_id, "vehicle": {"vehicleId": vehicle_id, **patch}})
+        self._events.append((event_id, data))
+        for queue in self._streams:
+            queue.put_nowait((event_id, data))
+        return event_id
+
+    def drop_streams(self) -> None:
+        """Close every open stream (the clients should reconnect and resume)."""
+        for queue in self._streams:
+            queue.put_nowait(None)
+
+    async def _stream(self, request):
+        queue: asyncio.Queue = asyncio.Queue()
+        last_id = request.headers.get("Last-Event-ID")
+        if last_id is not None and last_id.isdigit():
+            for event in self._events[int(last_id):]:
+                queue.put_nowait(event)
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        self._streams.add(queue)
+        try:
+            await resp.write(b"retry: 1000\n\n")
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.stream_heartbeat)
+                except asyncio.TimeoutError:
+                    await resp.write(b": heartbeat\n\n")
+                    continue
+                if event is None:
+                    break
+                event_id, data = event
+                await resp.write(f"id: {event_id}\nevent: vehicle\ndata: {data}\n\n".encode())
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._streams.discard(queue)
+        return resp
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-400", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--extra-bytes", type=int, default=0)
+    parser.add_argument("--no-etag", action="store_true")
+    parser.add_argument("--api-key", default="bench-key")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        vehicles=args.vehicles, latency=args.latency, jitter=args.jitter,
+        rate_429=args.rate_429, rate_400=args.rate_400, rate_5xx=args.rate_5xx,
+        extra_bytes=args.extra_bytes, etag=not args.no_etag, api_key=args.api_key,
+    )
+    web.run_app(server.build_app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
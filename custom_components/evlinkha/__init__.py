@@ -1,131 +1,159 @@
 # custom_components/evlinkha/__init__.py
 
 import logging
+import time
 from datetime import timedelta
-import voluptuous as vol
 from aiohttp import web
 
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.components.webhook import async_register, async_unregister
 
 from .const import (
     DOMAIN, ENVIRONMENTS,
-    CONF_API_KEY, CONF_ENVIRONMENT, CONF_VEHICLE_ID, CONF_UPDATE_INTERVAL,
-    DEFAULT_UPDATE_INTERVAL,
+    CONF_API_KEY, CONF_ENVIRONMENT, CONF_VEHICLE_ID, CONF_VEHICLE_IDS, CONF_UPDATE_INTERVAL,
+    CONF_ADAPTIVE_POLLING, CONF_PUSH_COALESCE_WINDOW, CONF_STREAMING,
+    DEFAULT_UPDATE_INTERVAL, DEFAULT_ADAPTIVE_POLLING, DEFAULT_PUSH_COALESCE_WINDOW, DEFAULT_STREAMING,
 )
-from .api import EVLinkHAClient
+from .api import EVLinkHAClient, EVLinkHAStream, async_acquire_session, async_release_session
+from .coordinator import EVLinkHAUserCoordinator, EVLinkHAVehicleCoordinator
+from .commands import ChargingCommands
+from .push import PushCoalescer
+from .snapshot import SnapshotStore
+from .telemetry import TelemetryRecorder
+from .analytics import ChargingAnalytics
+from .services import async_index_entry, async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["sensor", "device_tracker"]
 
-async def _handle_push_webhook(hass, webhook_id: str, request) -> web.Response:
-    """Push webhook for EVLinkHA – updates the vehicle coordinator."""
-    try:
-        data = await request.json()
-        _LOGGER.debug("Push payload: %s", data)
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-        coord = hass.data.get(DOMAIN, {}).get(f"{webhook_id}_vehicle")
-        old = coord.data or {}
-
-        # Ta endast vehicle-datan!
-        vehicle_update = data.get("vehicle", {})
-        if not vehicle_update:
-            _LOGGER.warning("No 'vehicle' field in webhook payload, ignoring.")
-            return web.Response(status=400, text="Missing vehicle data")
-        
-        # Start with a copy of the old values
-        merged = old.copy()
-        for key, val in vehicle_update.items():
-            if isinstance(val, dict) and isinstance(old.get(key), dict):
-                nested = old.get(key, {}).copy()
-                nested.update(val)
-                merged[key] = nested
-            else:
-                merged[key] = val
 
-        # Submit the merged data
-        coord.async_set_updated_data(merged)
-        _LOGGER.debug("Manually updated evlinkha vehicle status data")
+@callback
+def _route_push(hass, entry_id: str, data: dict) -> tuple[int, str]:
+    """
+    Queue one vehicle update (webhook or stream event) for an entry.
+    Returns (HTTP status, text) describing the outcome.
+    """
+    coord = hass.data.get(DOMAIN, {}).get(f"{entry_id}_vehicle")
+    push = hass.data.get(DOMAIN, {}).get(f"{entry_id}_push")
+    if coord is None or push is None:
+        return 404, "Unknown webhook"
+
+    # Ta endast vehicle-datan!
+    vehicle_update = data.get("vehicle", {})
+    if not vehicle_update:
+        _LOGGER.warning("No 'vehicle' field in push payload, ignoring.")
+        return 400, "Missing vehicle data"
+
+    # Fleet entries need to know which vehicle the push is for
+    vehicle_id = (
+        vehicle_update.get("vehicleId")
+        or data.get("vehicleId")
+        or (coord.vehicle_ids[0] if len(coord.vehicle_ids) == 1 else None)
+    )
+    if vehicle_id not in coord.vehicle_ids:
+        _LOGGER.warning("Push payload for unknown vehicle %s, ignoring.", vehicle_id)
+        return 400, "Unknown vehicle"
 
+    # Recursive partial update, applied with the rest of this burst
+    push.async_submit(vehicle_id, vehicle_update)
+    _LOGGER.debug("Queued evlinkha vehicle push for %s", vehicle_id)
+    return 200, "OK"
 
-        return web.Response(status=200, text="OK")
+
+async def _handle_push_webhook(hass, webhook_id: str, request) -> web.Response:
+    """
+    Push webhook for EVLinkHA – updates the vehicle coordinator.
+    The push is only validated and queued here; it is applied after the
+    response, coalesced with other pushes in the same window.
+    """
+    started = time.perf_counter()
+    try:
+        data = await request.json()
+        _LOGGER.debug("Push payload: %s", data)
+        status, text = _route_push(hass, webhook_id, data)
+        if status == 200:
+            coord = hass.data[DOMAIN][f"{webhook_id}_vehicle"]
+            coord.client.metrics.record_push(time.perf_counter() - started)
+        return web.Response(status=status, text=text)
 
     except Exception:
         _LOGGER.exception("Error in push webhook handler")
         return web.Response(status=500, text="Error")
 
+
+async def async_setup(hass, config) -> bool:
+    """Register the domain-level services, shared by all config entries."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass, entry) -> bool:
     """
     Set up EVLinkHA:
       • DataUpdateCoordinators (userinfo & vehicle status)
-      • Charging-service
-      • Push-webhook
+      • Push-webhook (registered first; pushes are buffered until ready)
+      • Vehicles indexed for the domain-level set_charging service
+
+    Only the vehicle data gates setup, and only when there is no snapshot
+    to start from. Userinfo is always fetched in the background.
     """
     _LOGGER.debug("Starting async_setup_entry for %s", entry.entry_id)
+    started = time.monotonic()
 
+    session = None
+    webhook_id = entry.entry_id
+    webhook_registered = False
+    unindex = None
     try:
         # Read configuration
         api_key    = entry.data[CONF_API_KEY]
         env        = entry.data.get(CONF_ENVIRONMENT, "sandbox")
-        vehicle_id = entry.data[CONF_VEHICLE_ID]
+        fleet      = CONF_VEHICLE_IDS in entry.data
+        vehicle_ids = list(entry.data[CONF_VEHICLE_IDS]) if fleet else [entry.data[CONF_VEHICLE_ID]]
+        vehicle_id = vehicle_ids[0]
         base_url   = ENVIRONMENTS[env]
         vehicle_poll_minutes = entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
         _LOGGER.info("---- [EVLinkHA] async_setup_entry called ----")
-        _LOGGER.info("Config: api_key=%s, env=%s, vehicle_id=%s, vehicle_poll_minutes=%s", api_key, env, vehicle_id, vehicle_poll_minutes)
+        _LOGGER.info("Config: api_key=%s, env=%s, vehicle_ids=%s, vehicle_poll_minutes=%s", api_key, env, vehicle_ids, vehicle_poll_minutes)
 
-        # Initialize API client
-        client = EVLinkHAClient(hass, api_key, base_url, vehicle_id)
+        # Initialize API client on the pooled keep-alive session for this environment
+        session = async_acquire_session(hass, base_url)
+        # Released by exactly this URL on unload: reconfigure may change the environment
+        hass.data.setdefault(DOMAIN, {})[f"{entry.entry_id}_base_url"] = base_url
+        client = EVLinkHAClient(hass, api_key, base_url, vehicle_id, session=session)
         _LOGGER.debug("EVLinkHAClient created")
 
-        # 1) User info coordinator (refresh every 5 minutes)
-        user_coord = DataUpdateCoordinator(
-            hass, _LOGGER,
-            name=f"{DOMAIN} user info",
-            update_method=client.async_get_userinfo,
-            update_interval=timedelta(minutes=vehicle_poll_minutes),
-        )
-        _LOGGER.debug("User DataUpdateCoordinator created (interval: %s min)", vehicle_poll_minutes)
-        await user_coord.async_config_entry_first_refresh()
-
-        # 2) Vehicle status coordinator (refresh every minute)
-        vehicle_coord = DataUpdateCoordinator(
-            hass, _LOGGER,
-            name=f"{DOMAIN} vehicle status",
-            update_method=client.async_get_vehicle_status,
+        # 1) User info coordinator (static tier, refreshed once per STATIC_TIER_TTL)
+        user_coord = EVLinkHAUserCoordinator(hass, client)
+        _LOGGER.debug("User coordinator created (interval: %s)", user_coord.update_interval)
+
+        # 2) Vehicle status coordinator (all vehicles of the entry, polled concurrently)
+        vehicle_coord = EVLinkHAVehicleCoordinator(
+            hass, client, vehicle_ids,
             update_interval=timedelta(minutes=vehicle_poll_minutes),
+            fleet=fleet,
+            adaptive=entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
         )
         _LOGGER.debug("Vehicle DataUpdateCoordinator created (interval: %s min)", vehicle_poll_minutes)
-        await vehicle_coord.async_config_entry_first_refresh()
 
-        # Store coordinators
+        # Store coordinators before any I/O so the webhook can find them
+        push = PushCoalescer(
+            hass, vehicle_coord,
+            window=entry.options.get(CONF_PUSH_COALESCE_WINDOW, DEFAULT_PUSH_COALESCE_WINDOW),
+            paused=True,
+        )
         hass.data.setdefault(DOMAIN, {})[entry.entry_id] = user_coord
         hass.data[DOMAIN][f"{entry.entry_id}_vehicle"] = vehicle_coord
+        hass.data[DOMAIN][f"{entry.entry_id}_push"] = push
+        commands = ChargingCommands(hass, vehicle_coord)
+        hass.data[DOMAIN][f"{entry.entry_id}_commands"] = commands
         _LOGGER.debug("Coordinators stored in hass.data for entry %s", entry.entry_id)
 
-        # 3) Register charging service
-        schema = vol.Schema({vol.Required("action"): vol.In(["START", "STOP"])})
-        async def _handle_charging(call):
-            action = call.data["action"]
-            _LOGGER.debug("Service set_charging called with action=%s", action)
-            try:
-                result = await client.async_set_charging(action)
-                if result:
-                    _LOGGER.info("Charging %s executed successfully", action)
-                else:
-                    _LOGGER.error("Charging %s failed or returned None", action)
-            except Exception as e:
-                _LOGGER.exception("Error in set_charging service")
-
-        hass.services.async_register(
-            DOMAIN,
-            "set_charging",
-            _handle_charging,
-            schema=schema,
-        )
-        _LOGGER.debug("Service set_charging registered")
-
-        # 4) Register webhook under /api/webhook/{entry_id}
-        webhook_id = entry.entry_id
+        # 3) Register webhook under /api/webhook/{entry_id} (buffered until step 5)
         async_register(
             hass,
             DOMAIN,
@@ -133,34 +161,132 @@ async def async_setup_entry(hass, entry) -> bool:
             webhook_id,
             _handle_push_webhook,
         )
+        webhook_registered = True
         _LOGGER.debug("Webhook registered with id=%s", webhook_id)
 
-        # 5) Forward to the sensor platform
-        await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+        # 4) Make the vehicles reachable for the domain-level set_charging service
+        unindex = async_index_entry(hass, entry.entry_id, commands, vehicle_ids, fleet)
+        entry.async_on_unload(unindex)
+
+        # 5) Initial data: last known snapshot, otherwise the first vehicle poll.
+        #    Userinfo (tier, email, sms_credits) never gates the vehicle sensors.
+        snapshot = SnapshotStore(hass, entry.entry_id)
+        restored = await snapshot.async_load()
+        if restored:
+            user_coord.fetched_at = restored.get("user_fetched")
+            user_coord.async_set_updated_data(restored.get("user") or None)
+            vehicle_coord.static_fetched.update(restored.get("static_fetched") or {})
+            vehicle_coord.async_set_updated_data(
+                {vid: restored["vehicles"].get(vid) for vid in vehicle_ids}
+            )
+        if not user_coord.is_fresh:
+            entry.async_create_background_task(hass, user_coord.async_refresh(), f"{DOMAIN} user refresh")
+        if restored:
+            entry.async_create_background_task(hass, vehicle_coord.async_refresh(), f"{DOMAIN} vehicle refresh")
+            _LOGGER.debug("Coordinators restored from snapshot, refreshing in background")
+        else:
+            await vehicle_coord.async_config_entry_first_refresh()
+        entry.async_on_unload(snapshot.async_track(user_coord, vehicle_coord))
+        telemetry = TelemetryRecorder(vehicle_coord)
+        hass.data[DOMAIN][f"{entry.entry_id}_telemetry"] = telemetry
+        entry.async_on_unload(telemetry.async_track())
+        analytics = ChargingAnalytics(vehicle_coord)
+        hass.data[DOMAIN][f"{entry.entry_id}_analytics"] = analytics
+        entry.async_on_unload(analytics.async_track())
+        push.async_resume()
+
+        # Optional outbound event stream, for installations the webhook cannot reach
+        def _on_stream_event(data: dict) -> None:
+            started = time.perf_counter()
+            if _route_push(hass, entry.entry_id, data)[0] == 200:
+                client.metrics.record_push(time.perf_counter() - started)
+
+        stream = EVLinkHAStream(client, _on_stream_event, vehicle_coord.async_set_streaming)
+        hass.data[DOMAIN][f"{entry.entry_id}_stream"] = stream
+        entry.async_on_unload(stream.async_stop)
+        if entry.options.get(CONF_STREAMING, DEFAULT_STREAMING):
+            stream.start(entry)
+
+        # Options are applied to the running objects; only changed entry
+        # data (reconfigure) needs a full reload
+        setup_data = dict(entry.data)
+
+        async def _async_entry_updated(hass, entry) -> None:
+            if dict(entry.data) != setup_data:
+                _LOGGER.info("Entry data changed for %s, reloading", entry.entry_id)
+                hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+                return
+            minutes = entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+            vehicle_coord.async_apply_options(
+                timedelta(minutes=minutes),
+                entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+            )
+            push.async_set_window(entry.options.get(CONF_PUSH_COALESCE_WINDOW, DEFAULT_PUSH_COALESCE_WINDOW))
+            if entry.options.get(CONF_STREAMING, DEFAULT_STREAMING):
+                stream.start(entry)
+            else:
+                await stream.async_stop()
+            _LOGGER.info("Options applied to %s without reload: %s", entry.entry_id, dict(entry.options))
+
+        entry.async_on_unload(entry.add_update_listener(_async_entry_updated))
+
+        # 6) Forward to the sensor and device_tracker platforms
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         _LOGGER.debug("Forwarded entry to sensor platform")
 
-        _LOGGER.info("---- [EVLinkHA] async_setup_entry finished for %s ----", entry.entry_id)
+        _LOGGER.info(
+            "---- [EVLinkHA] async_setup_entry finished for %s in %.2f s ----",
+            entry.entry_id, time.monotonic() - started,
+        )
         return True
 
     except Exception:
         _LOGGER.exception("Error setting up EVLinkHA integration")
+        if webhook_registered:
+            async_unregister(hass, webhook_id)
+        # on_unload callbacks are not run for a setup that returns False
+        if unindex is not None:
+            unindex()
+        push = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_push", None)
+        if push is not None:
+            push.async_shutdown()
+        commands = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_commands", None)
+        if commands is not None:
+            commands.async_shutdown()
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_vehicle", None)
+        hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_telemetry", None)
+        hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_analytics", None)
+        stream = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_stream", None)
+        if stream is not None:
+            await stream.async_stop()
+        hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_base_url", None)
+        if session is not None:
+            await async_release_session(hass, base_url)
         return False
 
 async def async_unload_entry(hass, entry) -> bool:
-    """Unload EVLinkHA: deregister webhook & service, remove coordinators."""
+    """Unload EVLinkHA: deregister webhook, remove coordinators (services stay)."""
     _LOGGER.debug("Unloading EVLinkHA entry %s", entry.entry_id)
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
-    hass.services.async_remove(DOMAIN, "set_charging")
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     async_unregister(hass, entry.entry_id)
-    _LOGGER.debug("Service and webhook unregistered")
+    _LOGGER.debug("Webhook unregistered")
     hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
     hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_vehicle", None)
+    hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_telemetry", None)
+    hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_analytics", None)
+    hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_stream", None)
+    push = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_push", None)
+    if push is not None:
+        push.async_shutdown()
+    commands = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_commands", None)
+    if commands is not None:
+        commands.async_shutdown()
+    base_url = hass.data.get(DOMAIN, {}).pop(f"{entry.entry_id}_base_url", None)
+    if base_url is not None:
+        await async_release_session(hass, base_url)
     return unload_ok
 
-# Lägg till denna!
-async def async_reload_entry(hass, entry):
-    """Reload EVLinkHA config entry when options are updated."""
-    _LOGGER.info("---- [EVLinkHA] async_reload_entry called for %s ----", entry.entry_id)
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
-    _LOGGER.info("---- [EVLinkHA] async_reload_entry finished for %s ----", entry.entry_id)
+async def async_remove_entry(hass, entry) -> None:
+    """Delete the persisted snapshot when the entry is removed."""
+    await SnapshotStore(hass, entry.entry_id).async_remove()
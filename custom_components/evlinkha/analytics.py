@@ -0,0 +1,173 @@
+# custom_components/evlinkha/analytics.py
+
+import math
+import time
+
+from homeassistant.core import callback
+
+from .const import ANALYTICS_EWMA_TAU
+from .helpers.fields import FieldAccessor
+
+_LEVEL = FieldAccessor("chargeState.batteryLevel")
+_CAPACITY = FieldAccessor("chargeState.batteryCapacity")
+_LIMIT = FieldAccessor("chargeState.chargeLimit")
+_RATE = FieldAccessor("chargeState.chargeRate")
+_CHARGING = FieldAccessor("chargeState.isCharging")
+_ODOMETER = FieldAccessor("odometer.distance")
+
+# Status fields the derived values are computed from (for entity write filtering)
+ANALYTICS_SOURCE_FIELDS = (
+    "chargeState.batteryLevel", "chargeState.batteryCapacity", "chargeState.chargeLimit",
+    "chargeState.chargeRate", "chargeState.isCharging", "odometer.distance",
+)
+
+
+def _num(value) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class VehicleAnalytics:
+    """
+    Derived charging values for one vehicle, updated per status sample.
+
+    Every update is O(1): only the previous sample and a few running sums
+    are kept.
+      • session_energy: kWh added since charging last started, from the
+        battery level gain (or the integrated charge rate when the battery
+        capacity is unknown); kept after charging stops until the next session
+      • charge_rate_ewma: time-weighted EWMA of the charge rate while charging
+      • time_to_limit: minutes until chargeLimit at the EWMA rate
+      • efficiency: km per kWh over all drives seen, from odometer distance
+        and battery level drop between charges
+    """
+
+    __slots__ = (
+        "session_energy", "charge_rate_ewma", "time_to_limit", "efficiency",
+        "_last_ts", "_last_level", "_last_rate", "_charging",
+        "_drive_odo", "_drive_level", "_drive_km", "_drive_kwh",
+    )
+
+    def __init__(self):
+        self.session_energy: float | None = None
+        self.charge_rate_ewma: float | None = None
+        self.time_to_limit: float | None = None
+        self.efficiency: float | None = None
+        self._last_ts: float | None = None
+        self._last_level: float | None = None
+        self._last_rate: float | None = None
+        self._charging = False
+        # Drive segment anchor (odometer, level) and running totals
+        self._drive_odo: float | None = None
+        self._drive_level: float | None = None
+        self._drive_km = 0.0
+        self._drive_kwh = 0.0
+
+    def update(self, status: dict, ts: float) -> None:
+        level = _num(_LEVEL(status))
+        capacity = _num(_CAPACITY(status))
+        limit = _num(_LIMIT(status))
+        rate = _num(_RATE(status))
+        odometer = _num(_ODOMETER(status))
+        charging = bool(_CHARGING(status))
+        dt = ts - self._last_ts if self._last_ts is not None else 0.0
+
+        if charging and not self._charging:
+            # New session
+            self.session_energy = 0.0
+            self.charge_rate_ewma = None
+            self._close_drive(odometer, level, capacity)
+        elif charging:
+            if capacity and level is not None and self._last_level is not None:
+                self.session_energy += max(level - self._last_level, 0.0) / 100 * capacity
+            elif rate is not None and self._last_rate is not None and dt > 0:
+                self.session_energy += (rate + self._last_rate) / 2 * dt / 3600
+
+        if charging and rate is not None:
+            if self.charge_rate_ewma is None:
+                self.charge_rate_ewma = rate
+            elif dt > 0:
+                # Weight by elapsed time, so irregular polls/pushes average correctly
+                alpha = 1 - math.exp(-dt / ANALYTICS_EWMA_TAU)
+                self.charge_rate_ewma += alpha * (rate - self.charge_rate_ewma)
+
+        if not charging:
+            self.time_to_limit = None
+            self._track_drive(odometer, level, capacity)
+        elif level is not None and limit is not None and capacity and self.charge_rate_ewma:
+            remaining_kwh = max(limit - level, 0.0) / 100 * capacity
+            self.time_to_limit = remaining_kwh / self.charge_rate_ewma * 60
+        else:
+            self.time_to_limit = None
+
+        self._charging = charging
+        self._last_ts = ts
+        self._last_level = level
+        self._last_rate = rate if charging else None
+
+    def _track_drive(self, odometer, level, capacity) -> None:
+        if odometer is None or level is None:
+            return
+        if self._drive_odo is None or level > self._drive_level or odometer < self._drive_odo:
+            self._drive_odo, self._drive_level = odometer, level
+            return
+        if level < self._drive_level:
+            self._close_drive(odometer, level, capacity)
+
+    def _close_drive(self, odometer, level, capacity) -> None:
+        """Book the distance and energy since the anchor, then re-anchor."""
+        if (
+            capacity and odometer is not None and level is not None
+            and self._drive_odo is not None and not self._charging
+        ):
+            km = odometer - self._drive_odo
+            kwh = (self._drive_level - level) / 100 * capacity
+            if km > 0 and kwh > 0:
+                self._drive_km += km
+                self._drive_kwh += kwh
+                self.efficiency = self._drive_km / self._drive_kwh
+        self._drive_odo, self._drive_level = odometer, level
+
+    def as_dict(self) -> dict:
+        return {
+            "session_energy": None if self.session_energy is None else round(self.session_energy, 2),
+            "charge_rate_ewma": None if self.charge_rate_ewma is None else round(self.charge_rate_ewma, 2),
+            "time_to_limit": None if self.time_to_limit is None else round(self.time_to_limit),
+            "efficiency": None if self.efficiency is None else round(self.efficiency, 2),
+        }
+
+
+class ChargingAnalytics:
+    """Keeps VehicleAnalytics of every vehicle current with the coordinator."""
+
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+        self.vehicles = {vid: VehicleAnalytics() for vid in coordinator.vehicle_ids}
+        self._seen: dict[str, dict] = {}
+
+    @callback
+    def _async_update(self) -> None:
+        now = time.time()
+        for vid in self.vehicles:
+            self._update_vehicle(vid, now)
+
+    def _update_vehicle(self, vehicle_id: str, now: float) -> None:
+        status = (self.coordinator.data or {}).get(vehicle_id)
+        if status is None or self._seen.get(vehicle_id) is status:
+            return
+        self._seen[vehicle_id] = status
+        self.vehicles[vehicle_id].update(status, now)
+
+    def get(self, vehicle_id: str) -> dict:
+        """Current derived values of one vehicle (rounded for display)."""
+        if vehicle_id not in self.vehicles:
+            return {}
+        # Catch up if an entity reads before this update reached our listener
+        self._update_vehicle(vehicle_id, time.time())
+        return self.vehicles[vehicle_id].as_dict()
+
+    def async_track(self):
+        """Update on every coordinator update; returns a callable that stops it."""
+        self._async_update()
+        return self.coordinator.async_add_listener(self._async_update)
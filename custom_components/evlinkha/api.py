@@ -2,14 +2,537 @@
 EVLinkHA API client for fetching user and vehicle information and 
 handling rate‐limit (HTTP 429) with persistent notifications.
 """
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
+import json
+import random
+import time
 import aiohttp
 import logging
 
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from .const import (
+    DOMAIN,
+    HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT, HTTP_REUSE_TTL,
+    RATE_LIMIT_PER_MINUTE, RATE_LIMIT_WINDOW, RATE_LIMIT_BURST, RATE_LIMIT_COMMAND_BURST,
+    RATE_LIMIT_POLL_MAX_WAIT, RATE_LIMIT_COMMAND_MAX_WAIT,
+    RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX,
+    METRICS_SAMPLES,
+    STREAM_HEARTBEAT_TIMEOUT, STREAM_BACKOFF_BASE, STREAM_BACKOFF_MAX,
+)
+
+from .model import VehicleState, parse_status
+
 _LOGGER = logging.getLogger(__name__)
 
+# hass.data[DOMAIN][SESSIONS] = {base_url: [session, refcount]}
+SESSIONS = "sessions"
+# hass.data[DOMAIN][RATE_LIMITERS] = {api_key: RateLimiter}
+RATE_LIMITERS = "rate_limiters"
+# hass.data[DOMAIN][FLIGHTS] = {api_key: SingleFlight}
+FLIGHTS = "flights"
+
+# Priority lanes for the rate limiter (lower is more important)
+PRIORITY_COMMAND = 0
+PRIORITY_POLL    = 1
+
+
+def async_acquire_session(hass, base_url: str) -> aiohttp.ClientSession:
+    """
+    Return the pooled keep-alive session for an environment.
+
+    All config entries talking to the same base_url share one session (and
+    its connection pool). Every acquire must be paired with
+    async_release_session when the entry is unloaded.
+    """
+    pool = hass.data.setdefault(DOMAIN, {}).setdefault(SESSIONS, {})
+    base_url = base_url.rstrip("/")
+    slot = pool.get(base_url)
+    if slot is None or slot[0].closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+        slot = pool[base_url] = [session, 0]
+        _LOGGER.debug(f"[EVLinkHAClient] Created pooled session for {base_url}")
+
+        async def _close_on_stop(_event):
+            if not session.closed:
+                await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close_on_stop)
+    slot[1] += 1
+    return slot[0]
+
+
+async def async_release_session(hass, base_url: str) -> None:
+    """Drop one reference to a pooled session and close it when unused."""
+    pool = hass.data.get(DOMAIN, {}).get(SESSIONS, {})
+    base_url = base_url.rstrip("/")
+    slot = pool.get(base_url)
+    if slot is None:
+        return
+    slot[1] -= 1
+    if slot[1] <= 0:
+        pool.pop(base_url, None)
+        if not slot[0].closed:
+            await slot[0].close()
+        _LOGGER.debug(f"[EVLinkHAClient] Closed pooled session for {base_url}")
+
+
+class EVLinkHARateLimited(UpdateFailed):
+    """Request deferred (or rejected with 429) because of the API rate limit."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited by EVLinkHA, retry in {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_reset(value: str | None) -> float | None:
+    """X-RateLimit-Reset as seconds from now (epoch or delta-seconds)."""
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 1e9:  # epoch timestamp
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def _parse_window(headers) -> float:
+    """Seconds X-RateLimit-Limit counts over: RateLimit-Policy `w`, else RATE_LIMIT_WINDOW."""
+    policy = headers.get("RateLimit-Policy") or headers.get("X-RateLimit-Policy") or ""
+    for param in policy.split(",")[0].split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name == "w":
+            try:
+                window = float(value)
+            except ValueError:
+                break
+            if window > 0:
+                return window
+    return RATE_LIMIT_WINDOW
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every client using the same API key.
+
+    The bucket only engages once the API has shown a limit: an
+    X-RateLimit-Limit/-Remaining header or a 429/503. Until then requests
+    are sent as they come, since any client-side rate would be a guess.
+    Charging commands have a bucket of their own (RATE_LIMIT_COMMAND_BURST,
+    sized for a fleet-wide set_charging fan-out), so they never compete
+    with polls for tokens.
+
+    A 429/503 or an exhausted X-RateLimit-Remaining blocks the bucket until
+    Retry-After (or the reset time); without a hint it backs off
+    exponentially with jitter. A poll that cannot have a token within
+    RATE_LIMIT_POLL_MAX_WAIT (0: at once) is deferred with
+    EVLinkHARateLimited instead of being sent and rejected, so it never
+    sleeps while holding one of the coordinator's fleet slots.
+
+    X-RateLimit-Limit sets the bucket size and refill rate, and
+    X-RateLimit-Remaining the tokens left. The limit counts requests per
+    window: the `w` parameter of a RateLimit-Policy header (`100;w=3600`)
+    when the API sends one, RATE_LIMIT_WINDOW seconds otherwise.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = RATE_LIMIT_PER_MINUTE,
+        burst: int = RATE_LIMIT_BURST,
+        command_burst: int = RATE_LIMIT_COMMAND_BURST,
+    ):
+        self._rate = rate_per_minute / 60
+        self._burst = burst
+        self._tokens = float(burst)
+        self._command_burst = command_burst
+        self._command_tokens = float(command_burst)
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self.engaged = False
+
+    def _refill(self, now: float) -> None:
+        gained = (now - self._stamp) * self._rate
+        self._tokens = min(self._burst, self._tokens + gained)
+        self._command_tokens = min(self._command_burst, self._command_tokens + gained)
+        self._stamp = now
+
+    def wait_time(self, priority: int = PRIORITY_POLL) -> float:
+        """Seconds until a request in this lane may be sent (0 = now)."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if not self.engaged:
+            return 0.0
+        tokens = self._command_tokens if priority == PRIORITY_COMMAND else self._tokens
+        missing = 1 - tokens
+        return 0.0 if missing <= 0 else missing / self._rate
+
+    async def async_acquire(self, priority: int = PRIORITY_POLL, max_wait: float | None = None) -> None:
+        """Take one token, waiting up to max_wait; raises EVLinkHARateLimited."""
+        if max_wait is None:
+            max_wait = RATE_LIMIT_COMMAND_MAX_WAIT if priority == PRIORITY_COMMAND else RATE_LIMIT_POLL_MAX_WAIT
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self.wait_time(priority)
+            if wait <= 0:
+                if self.engaged:
+                    if priority == PRIORITY_COMMAND:
+                        self._command_tokens -= 1
+                    else:
+                        self._tokens -= 1
+                return
+            if time.monotonic() + wait > deadline:
+                raise EVLinkHARateLimited(wait)
+            await asyncio.sleep(wait)
+
+    def _backoff(self) -> float:
+        cap = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** (self._failures - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def update(self, status: int, headers) -> float | None:
+        """
+        Feed a response into the limiter.
+        Returns the block time in seconds when the response was a 429/503.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        try:
+            remaining = float(headers.get("X-RateLimit-Remaining"))
+        except (TypeError, ValueError):
+            remaining = None
+        try:
+            limit = float(headers.get("X-RateLimit-Limit"))
+        except (TypeError, ValueError):
+            limit = None
+        if not self.engaged and (remaining is not None or limit is not None or status in (429, 503)):
+            _LOGGER.debug("[EVLinkHAClient] Rate limiter engaged by the API's limit headers")
+            self.engaged = True
+        if limit is not None and limit > 0:
+            window = _parse_window(headers)
+            if limit / window != self._rate or limit != self._burst:
+                _LOGGER.debug(f"[EVLinkHAClient] Rate limiter set to {limit:g} requests per {window:g} s by the API")
+                self._rate = limit / window
+                self._burst = limit
+        if remaining is not None:
+            # The API's count is the truth; it also covers other clients of the key
+            self._tokens = min(remaining, self._burst)
+
+        if status in (429, 503):
+            self._failures += 1
+            delay = _parse_retry_after(headers.get("Retry-After"))
+            if delay is None:
+                delay = _parse_reset(headers.get("X-RateLimit-Reset"))
+            if delay is None:
+                delay = self._backoff()
+            self._blocked_until = max(self._blocked_until, now + delay)
+            _LOGGER.debug(f"[EVLinkHAClient] Rate limiter blocked for {delay:.0f} s (HTTP {status})")
+            return delay
+
+        self._failures = 0
+        if remaining is not None and remaining <= 0:
+            reset = _parse_reset(headers.get("X-RateLimit-Reset"))
+            if reset:
+                self._blocked_until = max(self._blocked_until, now + reset)
+        return None
+
+
+def get_rate_limiter(hass, api_key: str) -> RateLimiter:
+    """Rate limiter shared by all clients (and entries) using this API key."""
+    limiters = hass.data.setdefault(DOMAIN, {}).setdefault(RATE_LIMITERS, {})
+    if api_key not in limiters:
+        limiters[api_key] = RateLimiter()
+    return limiters[api_key]
+
+
+class SingleFlight:
+    """
+    Request deduplication shared by every client using the same API key.
+
+    A caller asking for a key (method, URL, ...) that is already in flight
+    awaits that request instead of sending its own, so a coordinator
+    refresh, a manual update_entity and a config flow validation that
+    coincide cost one request and one rate limit token. A response that
+    `reusable` accepts answers the same key for another `ttl` seconds.
+
+    The request runs as its own task: a caller that is cancelled (e.g. a
+    timed-out refresh) does not cancel it for the others.
+    """
+
+    def __init__(self, ttl: float = HTTP_REUSE_TTL):
+        self.ttl = ttl
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._recent: dict[tuple, tuple[float, object]] = {}
+        self.stats = {"sent": 0, "joined": 0, "reused": 0}
+
+    @property
+    def busy(self) -> bool:
+        """A request is in flight."""
+        return bool(self._inflight)
+
+    async def async_run(self, key: tuple, factory, reusable=None):
+        """Result of factory() for `key`, shared with concurrent callers."""
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > time.monotonic():
+                self.stats["reused"] += 1
+                return recent[1]
+            del self._recent[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._finish(key, done, reusable))
+            self.stats["sent"] += 1
+        else:
+            self.stats["joined"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: tuple, task: asyncio.Future, reusable) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # exception() also marks it retrieved when every caller left
+        if self.ttl > 0 and reusable is not None and reusable(task.result()):
+            now = time.monotonic()
+            # Expired entries only matter for memory; drop them on the way
+            self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+            self._recent[key] = (now + self.ttl, task.result())
+
+
+def get_single_flight(hass, api_key: str) -> SingleFlight:
+    """Request deduplication shared by all clients (and entries) using this API key."""
+    flights = hass.data.setdefault(DOMAIN, {}).setdefault(FLIGHTS, {})
+    if api_key not in flights:
+        flights[api_key] = SingleFlight()
+    return flights[api_key]
+
+
+def discard_key_state(hass, api_key: str) -> None:
+    """
+    Drop the rate limiter and single-flight of an API key nothing uses any
+    more (e.g. a key only tried in a config flow). Kept while one of its
+    requests is in flight.
+    """
+    domain = hass.data.get(DOMAIN, {})
+    flight = domain.get(FLIGHTS, {}).get(api_key)
+    if flight is not None and flight.busy:
+        return
+    domain.get(FLIGHTS, {}).pop(api_key, None)
+    domain.get(RATE_LIMITERS, {}).pop(api_key, None)
+
+
+def _percentiles(samples) -> dict:
+    """p50/p95/p99 in milliseconds of a sample window (seconds)."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        f"p{p}": round(ordered[round(p / 100 * last)] * 1000, 1)
+        for p in (50, 95, 99)
+    }
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "statuses", "bytes", "latencies", "decode_s", "decodes")
+
+    def __init__(self, samples: int):
+        self.requests = 0
+        self.statuses: dict[str, int] = {}
+        self.bytes = 0
+        self.latencies = deque(maxlen=samples)
+        self.decode_s = 0.0
+        self.decodes = 0
+
+
+class ClientMetrics:
+    """
+    Request instrumentation for one EVLinkHAClient.
+
+    Per endpoint: request count, status classes (2xx/304/429/4xx/5xx,
+    error for exceptions, deferred for polls held back by the rate
+    limiter, shared for calls answered by another caller's request),
+    bytes received, a window of the last METRICS_SAMPLES
+    latencies for p50/p95/p99, and JSON decode time. Webhook pushes are
+    recorded too: handler time and time to apply them to the coordinator.
+    """
+
+    def __init__(self, samples: int = METRICS_SAMPLES):
+        self._samples = samples
+        self.endpoints: dict[str, _EndpointStats] = {}
+        self.pushes = 0
+        self.push_handler = deque(maxlen=samples)
+        self.push_apply = deque(maxlen=samples)
+
+    def _endpoint(self, endpoint: str) -> _EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = _EndpointStats(self._samples)
+        return stats
+
+    def record_request(self, endpoint: str, status: int | str, latency: float, nbytes: int = 0) -> None:
+        stats = self._endpoint(endpoint)
+        stats.requests += 1
+        stats.bytes += nbytes
+        stats.latencies.append(latency)
+        if isinstance(status, int):
+            if status in (304, 429):
+                status = str(status)
+            else:
+                status = f"{status // 100}xx"
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def record_deferred(self, endpoint: str) -> None:
+        stats = self._endpoint(endpoint)
+        stats.statuses["deferred"] = stats.statuses.get("deferred", 0) + 1
+
+    def record_shared(self, endpoint: str) -> None:
+        stats = self._endpoint(endpoint)
+        stats.statuses["shared"] = stats.statuses.get("shared", 0) + 1
+
+    def record_decode(self, endpoint: str, seconds: float) -> None:
+        stats = self._endpoint(endpoint)
+        stats.decode_s += seconds
+        stats.decodes += 1
+
+    def record_push(self, handler_s: float) -> None:
+        self.pushes += 1
+        self.push_handler.append(handler_s)
+
+    def record_push_apply(self, seconds: float) -> None:
+        self.push_apply.append(seconds)
+
+    def _count(self, *statuses: str) -> int:
+        return sum(
+            stats.statuses.get(status, 0)
+            for stats in self.endpoints.values()
+            for status in statuses
+        )
+
+    def summary(self) -> dict:
+        """Flat totals, as shown by the diagnostic sensors."""
+        latencies = [lat for stats in self.endpoints.values() for lat in stats.latencies]
+        return {
+            "requests": sum(stats.requests for stats in self.endpoints.values()),
+            "latency_p95": _percentiles(latencies)["p95"],
+            "errors": self._count("4xx", "5xx", "error"),
+            "rate_limited": self._count("429", "deferred"),
+            "bytes": sum(stats.bytes for stats in self.endpoints.values()),
+            "pushes": self.pushes,
+            "push_p95": _percentiles(self.push_apply)["p95"],
+        }
+
+    def as_dict(self) -> dict:
+        """Full breakdown per endpoint (diagnostics download)."""
+        return {
+            "summary": self.summary(),
+            "endpoints": {
+                name: {
+                    "requests": stats.requests,
+                    "statuses": dict(stats.statuses),
+                    "bytes": stats.bytes,
+                    "latency_ms": _percentiles(stats.latencies),
+                    "json_decode_ms_avg": (
+                        round(stats.decode_s / stats.decodes * 1000, 3) if stats.decodes else None
+                    ),
+                }
+                for name, stats in self.endpoints.items()
+            },
+            "push": {
+                "received": self.pushes,
+                "handler_ms": _percentiles(self.push_handler),
+                "apply_ms": _percentiles(self.push_apply),
+            },
+        }
+
+
+class _Response:
+    """
+    Status, headers and raw body of a completed request.
+    For a 304 answered from the response cache, `not_modified` is set and
+    json() returns the cached object itself (no re-parse).
+    With `parse`, json() returns parse(decoded JSON) instead.
+    """
+
+    __slots__ = ("status", "headers", "body", "not_modified", "_data", "_on_decode", "_parse")
+
+    def __init__(self, status: int, headers, body: bytes, data=None, not_modified: bool = False,
+                 on_decode=None, parse=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.not_modified = not_modified
+        self._data = data
+        self._on_decode = on_decode  # called with the decode (and parse) time in seconds
+        self._parse = parse
+
+    def json(self):
+        if self._data is None:
+            start = time.perf_counter()
+            self._data = json.loads(self.body)
+            if self._parse is not None:
+                self._data = self._parse(self._data)
+            if self._on_decode is not None:
+                self._on_decode(time.perf_counter() - start)
+        return self._data
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class _Identity:
+    """Hashable stand-in comparing an object by identity (and keeping it alive)."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+
+def _is_success(response: _Response) -> bool:
+    return 200 <= response.status < 300
+
+
 class EVLinkHAClient:
     """
     HTTP client to interact with EVLinkHA backend.
@@ -19,101 +542,242 @@ class EVLinkHAClient:
       api_key (str): Bearer token.
       base_url (str): Base URL of the EVLinkHA API.
       vehicle_id (str): ID of the vehicle for status/charge endpoints.
+      session (aiohttp.ClientSession | None): Pooled session from
+        async_acquire_session. Falls back to Home Assistant's shared session.
+      timeout (float): Total per-request timeout in seconds.
     """
-    def __init__(self, hass, api_key: str, base_url: str, vehicle_id: str):
+    def __init__(
+        self,
+        hass,
+        api_key: str,
+        base_url: str,
+        vehicle_id: str,
+        session: aiohttp.ClientSession | None = None,
+        timeout: float = HTTP_TIMEOUT,
+    ):
         self.hass       = hass
         self.api_key    = api_key
         self.base_url   = base_url.rstrip("/")
         self.vehicle_id = vehicle_id
+        self._session   = session
+        self._timeout   = aiohttp.ClientTimeout(total=timeout, connect=HTTP_CONNECT_TIMEOUT)
+        self._limiter   = get_rate_limiter(hass, api_key)
+        self.flights    = get_single_flight(hass, api_key)
+        # Conditional GET cache: url -> (etag, last_modified, parsed body)
+        self._cache: dict[str, tuple[str | None, str | None, object]] = {}
+        self.metrics    = ClientMetrics()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Session used for all requests (never closed by the client)."""
+        if self._session is None or self._session.closed:
+            self._session = async_get_clientsession(self.hass)
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        priority: int = PRIORITY_POLL,
+        timeout: aiohttp.ClientTimeout | None = None,
+        cache: bool = False,
+        parse=None,
+        refresh: bool = False,
+        parse_key=None,
+        **kwargs,
+    ) -> _Response:
+        """
+        Send one request through the shared rate limiter and read the body.
+        Raises EVLinkHARateLimited if the request had to be deferred.
+
+        With cache=True the request is a conditional GET: the stored
+        ETag/Last-Modified validators are sent and a 304 is answered with
+        the previously parsed body (the same object, not a copy). With
+        refresh=True no validators are sent: the server answers in full and
+        the cache entry is replaced by the new parse.
+        `parse` turns the decoded JSON of a 2xx body into the object json()
+        returns (and the cache keeps).
+        Every request is recorded in self.metrics under `endpoint`.
+
+        A GET without further arguments goes through self.flights: while an
+        identical GET (from any client with this API key) is in flight, or
+        was answered successfully within HTTP_REUSE_TTL, its response is
+        returned instead of sending another (recorded as "shared").
+        A caller whose `parse` depends on its own state passes that state as
+        parse_key; only GETs with the same parse_key (the same object) share.
+        """
+        def send():
+            return self._async_send(
+                method, url, endpoint, priority, timeout, cache and not refresh, parse,
+                store=cache, **kwargs,
+            )
+
+        if method != "GET" or kwargs:
+            return await send()
+        sent = False
+
+        def leader():
+            nonlocal sent
+            sent = True
+            return send()
+
+        key = (method, url, refresh, None if parse_key is None else _Identity(parse_key))
+        response = await self.flights.async_run(key, leader, _is_success)
+        if not sent:
+            self.metrics.record_shared(endpoint)
+        return response
+
+    async def _async_send(
+        self, method, url, endpoint, priority, timeout, cache, parse, store=False, **kwargs
+    ) -> _Response:
+        try:
+            await self._limiter.async_acquire(priority)
+        except EVLinkHARateLimited:
+            self.metrics.record_deferred(endpoint)
+            raise
+        headers = {"X-API-Key": f"{self.api_key}", **kwargs.pop("headers", {})}
+        cached = self._cache.get(url) if cache else None
+        if cached:
+            etag, modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if modified:
+                headers["If-Modified-Since"] = modified
+
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method, url, headers=headers, timeout=timeout or self._timeout, **kwargs
+            ) as resp:
+                body = await resp.read()
+        except Exception:
+            self.metrics.record_request(endpoint, "error", time.perf_counter() - start)
+            raise
+        self.metrics.record_request(endpoint, resp.status, time.perf_counter() - start, len(body))
+        self._limiter.update(resp.status, resp.headers)
+
+        if resp.status == 304 and cached:
+            _LOGGER.debug(f"[EVLinkHAClient] Not modified: {url}")
+            return _Response(200, resp.headers, body, data=cached[2], not_modified=True)
+
+        response = _Response(
+            resp.status, resp.headers, body,
+            on_decode=lambda seconds: self.metrics.record_decode(endpoint, seconds),
+            parse=parse if 200 <= resp.status < 300 else None,
+        )
+        if store and resp.status == 200:
+            etag = resp.headers.get("ETag")
+            modified = resp.headers.get("Last-Modified")
+            if etag or modified:
+                self._cache[url] = (etag, modified, response.json())
+            else:
+                self._cache.pop(url, None)
+        return response
 
     async def async_get_userinfo(self) -> dict | None:
         url = f"{self.base_url}/api/v1/ha/me"
-        headers = {"X-API-Key": f"{self.api_key}"}
         _LOGGER.debug(f"[EVLinkHAClient] GET userinfo: {url}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=15) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        _LOGGER.debug(f"[EVLinkHAClient] Userinfo: {data}")
-                        return data
-
-                    _LOGGER.error(f"[EVLinkHAClient] Failed userinfo: HTTP {resp.status}")
+            resp = await self._request("GET", url, "me", cache=True)
+            if resp.status == 200:
+                data = resp.json()
+                _LOGGER.debug(f"[EVLinkHAClient] Userinfo: {data}")
+                return data
+
+            _LOGGER.error(f"[EVLinkHAClient] Failed userinfo: HTTP {resp.status}")
+        except EVLinkHARateLimited:
+            raise
         except Exception as err:
             _LOGGER.exception(f"[EVLinkHAClient] Exception fetching userinfo: {err}")
         return None
 
-    async def async_get_vehicle_status(self) -> dict:
+    async def async_get_vehicle_status(
+        self,
+        vehicle_id: str | None = None,
+        static: VehicleState | None = None,
+        refresh_static: bool = False,
+    ) -> VehicleState | None:
         """
-        Fetch full status for the configured vehicle.
-        Raises UpdateFailed on rate‐limit (429) to skip this cycle.
+        Fetch full status for a vehicle (defaults to the configured one),
+        parsed into a VehicleState once per changed response. With `static`
+        its static blocks are reused instead of the ones in the response.
+        An unchanged status (HTTP 304) returns the previous object.
+        The cached object may carry reused static blocks, so refresh_static
+        skips the conditional GET and parses every block from a full answer.
+        Raises EVLinkHARateLimited (an UpdateFailed) when rate limited (429)
+        or when the poll was deferred by the client-side limiter.
         """
-        _LOGGER.info("Polling vehicle status at %s", datetime.now())
-        url = f"{self.base_url}/api/v1/ha/status/{self.vehicle_id}"
-        headers = {"X-API-Key": f"{self.api_key}"}
+        vehicle_id = vehicle_id or self.vehicle_id
+        _LOGGER.info("Polling vehicle status for %s at %s", vehicle_id, datetime.now())
+        url = f"{self.base_url}/api/v1/ha/status/{vehicle_id}"
         _LOGGER.debug(f"[EVLinkHAClient] GET vehicle status: {url}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=15) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        _LOGGER.debug(f"[EVLinkHAClient] Vehicle status: {data}")
-                        return data
-
-                    if resp.status == 429:
-                        _LOGGER.warning(f"[EVLinkHAClient] Rate limited (429) on {url}")
-                        self.hass.async_create_task(
-                            self.hass.services.async_call(
-                                "persistent_notification",
-                                "create",
-                                {
-                                    "title": "EVLinkHA Rate Limit",
-                                    "message": (
-                                        f"Rate limit hit for vehicle {self.vehicle_id}. "
-                                        "Skipping this update."
-                                    ),
-                                },
-                            )
-                        )
-                        raise UpdateFailed("429 rate limited by EVLinkHA")
-                    
-                    # Bad request (e.g. invalid vehicle_id, backend error, etc)
-                    if resp.status == 400:
-                        text = await resp.text()
-                        _LOGGER.warning(f"[EVLinkHAClient] Vehicle status fetch rejected (400): {text}")
-                        self.hass.async_create_task(
-                            self.hass.services.async_call(
-                                "persistent_notification",
-                                "create",
-                                {
-                                    "title": "EVLinkHA Vehicle Status Error",
-                                    "message": (
-                                        f"Vehicle status request rejected for vehicle {self.vehicle_id}. "
-                                        f"Error: {text}"
-                                    ),
-                                },
-                            )
-                        )
-                        return None
-
-                    # Other errors
-                    text = await resp.text()
-                    _LOGGER.error(f"[EVLinkHAClient] Vehicle status fetch failed HTTP {resp.status}: {text}")
-                    self.hass.async_create_task(
-                        self.hass.services.async_call(
-                            "persistent_notification",
-                            "create",
-                            {
-                                "title": "EVLinkHA Vehicle Status Error",
-                                "message": (
-                                    f"Unexpected error {resp.status} when trying to fetch vehicle status."
-                                ),
-                            },
-                        )
+            resp = await self._request(
+                "GET", url, "status", cache=True, refresh=refresh_static,
+                parse=lambda data: parse_status(data, static), parse_key=static,
+            )
+            if resp.status == 200:
+                data = resp.json()
+                _LOGGER.debug(f"[EVLinkHAClient] Vehicle status: {data}")
+                return data
+
+            if resp.status == 429:
+                _LOGGER.warning(f"[EVLinkHAClient] Rate limited (429) on {url}")
+                self.hass.async_create_task(
+                    self.hass.services.async_call(
+                        "persistent_notification",
+                        "create",
+                        {
+                            "title": "EVLinkHA Rate Limit",
+                            "message": (
+                                f"Rate limit hit for vehicle {vehicle_id}. "
+                                "Skipping this update."
+                            ),
+                        },
                     )
-                    return None
+                )
+                raise EVLinkHARateLimited(self._limiter.wait_time())
 
+            # Bad request (e.g. invalid vehicle_id, backend error, etc)
+            if resp.status == 400:
+                text = resp.text()
+                _LOGGER.warning(f"[EVLinkHAClient] Vehicle status fetch rejected (400): {text}")
+                self.hass.async_create_task(
+                    self.hass.services.async_call(
+                        "persistent_notification",
+                        "create",
+                        {
+                            "title": "EVLinkHA Vehicle Status Error",
+                            "message": (
+                                f"Vehicle status request rejected for vehicle {vehicle_id}. "
+                                f"Error: {text}"
+                            ),
+                        },
+                    )
+                )
+                return None
+
+            # Other errors
+            text = resp.text()
+            _LOGGER.error(f"[EVLinkHAClient] Vehicle status fetch failed HTTP {resp.status}: {text}")
+            self.hass.async_create_task(
+                self.hass.services.async_call(
+                    "persistent_notification",
+                    "create",
+                    {
+                        "title": "EVLinkHA Vehicle Status Error",
+                        "message": (
+                            f"Unexpected error {resp.status} when trying to fetch vehicle status."
+                        ),
+                    },
+                )
+            )
+            return None
+
+        except EVLinkHARateLimited:
+            raise
         except Exception as err:
             _LOGGER.exception(f"[EVLinkHAClient] Exception fetching vehicle status: {err}")
             self.hass.async_create_task(
@@ -128,25 +792,31 @@ class EVLinkHAClient:
             )
             return None
 
-    async def async_set_charging(self, action: str) -> dict | None:
-        url = f"{self.base_url}/api/v1/ha/charging/{self.vehicle_id}"
-        headers = {
-            "X-API-Key": f"{self.api_key}",
-            "Content-Type": "application/json",
-        }
+    async def async_set_charging(self, action: str, vehicle_id: str | None = None) -> dict | None:
+        """
+        Send START/STOP for a vehicle; returns the backend response or None.
+        Raises EVLinkHARateLimited when the command could not be sent.
+        """
+        vehicle_id = vehicle_id or self.vehicle_id
+        url = f"{self.base_url}/api/v1/ha/charging/{vehicle_id}"
         payload = {"action": action.upper()}
         _LOGGER.debug(f"[EVLinkHAClient] POST charging: {url} payload={payload}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers, timeout=15) as resp:
-                    text = await resp.text()
-                    if resp.status in (200, 201):
-                        data = await resp.json()
-                        _LOGGER.debug(f"[EVLinkHAClient] Charging response: {data}")
-                        return data
-                    _LOGGER.error(
-                        f"[EVLinkHAClient] Charging failed HTTP {resp.status}: {text}"
-                    )
+            # Commands use the priority lane: never queued behind background polls
+            resp = await self._request(
+                "POST", url, "charging", priority=PRIORITY_COMMAND,
+                json=payload, headers={"Content-Type": "application/json"},
+            )
+            if resp.status in (200, 201):
+                data = resp.json()
+                _LOGGER.debug(f"[EVLinkHAClient] Charging response: {data}")
+                return data
+            _LOGGER.error(
+                f"[EVLinkHAClient] Charging failed HTTP {resp.status}: {resp.text()}"
+            )
+        except EVLinkHARateLimited as err:
+            _LOGGER.error(f"[EVLinkHAClient] Charging not sent: {err}")
+            raise
         except Exception as err:
             _LOGGER.exception(f"[EVLinkHAClient] Exception setting charging: {err}")
         return None
@@ -157,18 +827,183 @@ class EVLinkHAClient:
         Returns a list of dicts (id, displayName, model, etc), or empty list.
         """
         url = f"{self.base_url}/api/v1/ha/vehicles"
-        headers = {"X-API-Key": f"{self.api_key}"}
         _LOGGER.debug(f"[EVLinkHAClient] GET vehicles: {url}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        _LOGGER.debug(f"[EVLinkHAClient] Vehicles: {data}")
-                        # Expects: [{"id": "...", "displayName": "...", ...}, ...]
-                        return data if isinstance(data, list) else []
-                    _LOGGER.error(f"[EVLinkHAClient] Failed to get vehicles: HTTP {resp.status}")
+            resp = await self._request("GET", url, "vehicles", timeout=aiohttp.ClientTimeout(total=10))
+            if resp.status == 200:
+                data = resp.json()
+                _LOGGER.debug(f"[EVLinkHAClient] Vehicles: {data}")
+                # Expects: [{"id": "...", "displayName": "...", ...}, ...]
+                return data if isinstance(data, list) else []
+            _LOGGER.error(f"[EVLinkHAClient] Failed to get vehicles: HTTP {resp.status}")
+        except EVLinkHARateLimited as err:
+            _LOGGER.warning(f"[EVLinkHAClient] Vehicles not fetched: {err}")
         except Exception as err:
             _LOGGER.exception(f"[EVLinkHAClient] Exception fetching vehicles: {err}")
         return []
 
+
+class EVLinkHAStreamError(Exception):
+    """The event stream could not be opened."""
+
+
+class EVLinkHAStream:
+    """
+    Outbound server-sent events stream of vehicle updates.
+
+    Keeps one long-lived GET to /api/v1/ha/stream open. Every event's JSON
+    data is handed to `on_event` (same shape as a webhook payload). Any
+    bytes, including `:` comment heartbeats, prove the connection alive;
+    after `heartbeat` seconds of silence the stream is reopened. A
+    reconnect sends Last-Event-ID, so the backend can replay what was
+    missed. Failed connects back off exponentially with jitter (or honour
+    a 429's Retry-After / the server's `retry:` hint).
+
+    `on_health(True/False)` is called when the stream becomes usable or
+    drops, so polling can slow down while it is healthy.
+    """
+
+    def __init__(
+        self,
+        client: "EVLinkHAClient",
+        on_event,
+        on_health=None,
+        heartbeat: float = STREAM_HEARTBEAT_TIMEOUT,
+        backoff_base: float = STREAM_BACKOFF_BASE,
+        backoff_max: float = STREAM_BACKOFF_MAX,
+    ):
+        self.client = client
+        self._on_event = on_event
+        self._on_health = on_health
+        self.heartbeat = heartbeat
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.last_event_id: str | None = None
+        self.healthy = False
+        self._retry_hint: float | None = None
+        self._task: asyncio.Task | None = None
+        self.stats = {
+            "connects": 0,      # successful stream opens
+            "events": 0,        # events dispatched
+            "heartbeats": 0,    # comment lines received
+            "errors": 0,        # failed opens and broken streams
+        }
+
+    @property
+    def url(self) -> str:
+        return f"{self.client.base_url}/api/v1/ha/stream"
+
+    def start(self, entry) -> None:
+        """Run the stream as a background task of the config entry."""
+        if self._task is None or self._task.done():
+            self._task = entry.async_create_background_task(
+                self.client.hass, self.async_run(), f"{DOMAIN} event stream"
+            )
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._set_healthy(False)
+
+    def _set_healthy(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            self.healthy = healthy
+            _LOGGER.debug("[EVLinkHAStream] Stream %s", "healthy" if healthy else "down")
+            if self._on_health is not None:
+                self._on_health(healthy)
+
+    async def async_run(self) -> None:
+        """Connect, read and reconnect until cancelled."""
+        attempt = 0
+        while True:
+            delay = None
+            try:
+                await self._async_read_stream()
+                _LOGGER.debug("[EVLinkHAStream] Stream closed by the server")
+            except asyncio.CancelledError:
+                raise
+            except EVLinkHARateLimited as err:
+                self.stats["errors"] += 1
+                delay = err.retry_after
+            except Exception as err:
+                self.stats["errors"] += 1
+                _LOGGER.debug(f"[EVLinkHAStream] Stream error: {err!r}")
+            was_healthy = self.healthy
+            self._set_healthy(False)
+            if was_healthy:
+                attempt = 0
+            if delay is None:
+                delay = self._retry_hint or min(
+                    self.backoff_base * 2 ** attempt, self.backoff_max
+                ) * random.uniform(0.5, 1.0)
+            attempt += 1
+            _LOGGER.debug(f"[EVLinkHAStream] Reconnecting in {delay:.1f} s")
+            await asyncio.sleep(delay)
+
+    async def _async_read_stream(self) -> None:
+        headers = {
+            "X-API-Key": f"{self.client.api_key}",
+            "Accept": "text/event-stream",
+            "Cache-Control": "no-cache",
+        }
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = self.last_event_id
+        # No total timeout: silence longer than the heartbeat breaks the read
+        timeout = aiohttp.ClientTimeout(
+            total=None, connect=HTTP_CONNECT_TIMEOUT, sock_read=self.heartbeat
+        )
+        start = time.perf_counter()
+        async with self.client.session.get(self.url, headers=headers, timeout=timeout) as resp:
+            self.client.metrics.record_request("stream", resp.status, time.perf_counter() - start)
+            self.client._limiter.update(resp.status, resp.headers)
+            if resp.status == 429:
+                retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                # Retry-After: 0 is a valid "retry now", not a missing header
+                raise EVLinkHARateLimited(self.backoff_max if retry_after is None else retry_after)
+            if resp.status != 200:
+                raise EVLinkHAStreamError(f"HTTP {resp.status}")
+
+            self.stats["connects"] += 1
+            self._set_healthy(True)
+            event_id, data = None, []
+            async for raw in resp.content:
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                if not line:
+                    if data:
+                        self._dispatch(event_id, "\n".join(data))
+                    elif event_id is not None:
+                        self.last_event_id = event_id
+                    event_id, data = None, []
+                    continue
+                if line.startswith(":"):
+                    self.stats["heartbeats"] += 1
+                    continue
+                name, _, value = line.partition(":")
+                if value.startswith(" "):
+                    value = value[1:]
+                if name == "data":
+                    data.append(value)
+                elif name == "id":
+                    event_id = value
+                elif name == "retry" and value.isdigit():
+                    self._retry_hint = int(value) / 1000
+                # "event" names are informational: every event carries vehicle data
+
+    def _dispatch(self, event_id: str | None, data: str) -> None:
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            _LOGGER.warning(f"[EVLinkHAStream] Ignoring event with invalid JSON: {data[:200]}")
+            return
+        self.stats["events"] += 1
+        if event_id is not None:
+            self.last_event_id = event_id
+        try:
+            self._on_event(payload)
+        except Exception:
+            _LOGGER.exception("[EVLinkHAStream] Error handling stream event")
@@ -0,0 +1,228 @@
+# custom_components/evlinkha/commands.py
+
+import asyncio
+import logging
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import EVLinkHARateLimited
+from .const import CHARGING_CONFIRM_DELAY, CHARGING_OPTIMISTIC
+from .helpers.merge import DELETE_KEY
+from .model import StateNode
+
+_LOGGER = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _leaves(patch: dict, prefix: tuple = ()):
+    """(path, value) for every leaf of a nested patch."""
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            yield from _leaves(value, prefix + (key,))
+        else:
+            yield prefix + (key,), value
+
+
+def _lookup(data, path: tuple):
+    for key in path:
+        if not isinstance(data, (dict, StateNode)) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+def _nest(path: tuple, value) -> dict:
+    out = value
+    for key in reversed(path):
+        out = {key: out}
+    return out
+
+
+def _merge_into(target: dict, patch: dict) -> None:
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict) and DELETE_KEY not in value:
+            _merge_into(target[key], value)
+        else:
+            target[key] = value
+
+
+class _Command:
+    __slots__ = ("action", "future")
+
+    def __init__(self, action: str, future: asyncio.Future):
+        self.action = action
+        self.future = future
+
+
+class ChargingCommands:
+    """
+    Sends START/STOP charging commands for the vehicles of one entry.
+
+    At most one command per vehicle is on the wire. A command equal to the
+    one in flight (or queued) joins it instead of being sent again; a
+    queued command followed by its opposite cancels out, leaving only
+    the command in flight. The expected charge state is applied to the
+    coordinator as soon as a command is accepted, so entities reflect it
+    without waiting for the vehicle. When the last command for a vehicle
+    fails, the optimistic fields are restored to the state of the last
+    command the backend accepted (or to before the first command). Either
+    way a single confirming poll of only that vehicle follows after
+    `confirm_delay` seconds.
+    """
+
+    def __init__(self, hass, coordinator, confirm_delay: float = CHARGING_CONFIRM_DELAY):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.confirm_delay = confirm_delay
+        self._inflight: dict[str, _Command] = {}
+        self._queued: dict[str, _Command] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        # vehicle_id -> {path: value to restore}: before the first optimistic
+        # update, moved forward whenever a command is accepted
+        self._baseline: dict[str, dict[tuple, object]] = {}
+        self._unsub_confirm: dict[str, callable] = {}
+        self.stats = {
+            "sent": 0,          # commands sent to the backend
+            "joined": 0,        # calls that joined an identical pending command
+            "cancelled": 0,     # queued commands cancelled out by their opposite
+            "failed": 0,        # commands the backend did not accept
+            "rolled_back": 0,   # optimistic states restored after a failure
+        }
+
+    async def async_set_charging(self, vehicle_id: str, action: str) -> dict | None:
+        """
+        Request START or STOP for one vehicle.
+        Returns the backend response, or None if the command failed or was
+        cancelled out by a later opposite command. Raises EVLinkHARateLimited
+        when the command could not be sent because of the rate limit.
+        """
+        action = action.upper()
+        inflight = self._inflight.get(vehicle_id)
+        queued = self._queued.get(vehicle_id)
+
+        if queued is not None:
+            if queued.action == action:
+                self.stats["joined"] += 1
+                cmd = queued
+            else:
+                # START, STOP, START: the queued STOP never needs to be sent
+                self._queued.pop(vehicle_id)
+                self.stats["cancelled"] += 1
+                queued.future.set_result(None)
+                _LOGGER.debug("Queued %s for %s cancelled out by %s", queued.action, vehicle_id, action)
+                self.stats["joined"] += 1
+                cmd = inflight
+        elif inflight is not None:
+            if inflight.action == action:
+                self.stats["joined"] += 1
+                cmd = inflight
+            else:
+                cmd = self._queued[vehicle_id] = _Command(action, self.hass.loop.create_future())
+        else:
+            cmd = self._inflight[vehicle_id] = _Command(action, self.hass.loop.create_future())
+            self._cancel_confirm(vehicle_id)
+            self._tasks[vehicle_id] = self.hass.async_create_task(
+                self._async_drive(vehicle_id), f"evlinkha charging {vehicle_id}"
+            )
+
+        self._apply_optimistic(vehicle_id, action)
+        return await asyncio.shield(cmd.future)
+
+    @callback
+    def _apply_optimistic(self, vehicle_id: str, action: str) -> None:
+        patch = CHARGING_OPTIMISTIC.get(action)
+        if not patch:
+            return
+        baseline = self._baseline.setdefault(vehicle_id, {})
+        current = self.coordinator.vehicle_data(vehicle_id)
+        for path, _ in _leaves(patch):
+            baseline.setdefault(path, _lookup(current, path))
+        self.coordinator.async_apply_push(vehicle_id, patch, as_poll=False)
+
+    @callback
+    def _rollback(self, vehicle_id: str, action: str) -> None:
+        """Restore optimistic fields nothing else has overwritten since."""
+        baseline = self._baseline.pop(vehicle_id, None)
+        if not baseline:
+            return
+        current = self.coordinator.vehicle_data(vehicle_id)
+        expected = dict(_leaves(CHARGING_OPTIMISTIC.get(action, {})))
+        patch: dict = {}
+        for path, value in baseline.items():
+            if path in expected and _lookup(current, path) != expected[path]:
+                continue
+            _merge_into(patch, _nest(path, {DELETE_KEY: True} if value is _MISSING else value))
+        if patch:
+            self.stats["rolled_back"] += 1
+            self.coordinator.async_apply_push(vehicle_id, patch, as_poll=False)
+
+    async def _async_drive(self, vehicle_id: str) -> None:
+        """Send the vehicle's commands one at a time until none is left."""
+        try:
+            while (cmd := self._inflight.get(vehicle_id)) is not None:
+                self.stats["sent"] += 1
+                result = None
+                error = None
+                try:
+                    result = await self.coordinator.client.async_set_charging(cmd.action, vehicle_id)
+                except EVLinkHARateLimited as err:
+                    # Reported to the callers, per vehicle, instead of a bare None
+                    error = err
+                except Exception:
+                    _LOGGER.exception("Error sending charging %s for %s", cmd.action, vehicle_id)
+                if result is None:
+                    self.stats["failed"] += 1
+                if not cmd.future.done():
+                    if error is not None:
+                        cmd.future.set_exception(error)
+                    else:
+                        cmd.future.set_result(result)
+
+                nxt = self._queued.pop(vehicle_id, None)
+                if nxt is not None:
+                    if result is not None:
+                        # Accepted: a failure of the next command rolls back to this state
+                        self._baseline[vehicle_id] = dict(_leaves(CHARGING_OPTIMISTIC.get(cmd.action, {})))
+                    self._inflight[vehicle_id] = nxt
+                    continue
+                del self._inflight[vehicle_id]
+                if result is None:
+                    self._rollback(vehicle_id, cmd.action)
+                else:
+                    self._baseline.pop(vehicle_id, None)
+                # Also after a rollback: only the vehicle knows what it is doing now
+                self._schedule_confirm(vehicle_id)
+        finally:
+            self._tasks.pop(vehicle_id, None)
+
+    @callback
+    def _schedule_confirm(self, vehicle_id: str) -> None:
+        self._cancel_confirm(vehicle_id)
+
+        async def _async_confirm(_now) -> None:
+            self._unsub_confirm.pop(vehicle_id, None)
+            await self.coordinator.async_refresh_vehicle(vehicle_id)
+
+        self._unsub_confirm[vehicle_id] = async_call_later(self.hass, self.confirm_delay, _async_confirm)
+
+    @callback
+    def _cancel_confirm(self, vehicle_id: str) -> None:
+        unsub = self._unsub_confirm.pop(vehicle_id, None)
+        if unsub is not None:
+            unsub()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel pending commands and confirmation polls (entry unload)."""
+        for vehicle_id in list(self._unsub_confirm):
+            self._cancel_confirm(vehicle_id)
+        for task in self._tasks.values():
+            task.cancel()
+        for cmd in (*self._inflight.values(), *self._queued.values()):
+            if not cmd.future.done():
+                cmd.future.set_result(None)
+        self._inflight.clear()
+        self._queued.clear()
+        self._baseline.clear()
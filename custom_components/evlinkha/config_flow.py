@@ -1,9 +1,16 @@
 from homeassistant import config_entries
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 import logging
-from .const import DOMAIN, CONF_API_KEY, CONF_VEHICLE_ID, CONF_UPDATE_INTERVAL, CONF_ENVIRONMENT, ENVIRONMENTS
+from .const import DOMAIN, CONF_API_KEY, CONF_VEHICLE_ID, CONF_VEHICLE_IDS, CONF_UPDATE_INTERVAL, CONF_ENVIRONMENT, ENVIRONMENTS
+from .const import CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+from .const import CONF_PUSH_COALESCE_WINDOW, DEFAULT_PUSH_COALESCE_WINDOW
+from .const import CONF_TRACKER_DISTANCE, DEFAULT_TRACKER_DISTANCE
+from .const import CONF_TRACKER_MIN_INTERVAL, DEFAULT_TRACKER_MIN_INTERVAL
+from .const import CONF_STREAMING, DEFAULT_STREAMING
 
-from .api import EVLinkHAClient
+from .helpers.discovery import async_get_userinfo, async_get_vehicles
+from .helpers.validators import validate_api_key, validate_vehicle_id
 
 DEFAULT_UPDATE_INTERVAL = 6
 _LOGGER = logging.getLogger(__name__)
@@ -13,6 +20,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self):
+        # Vehicle list fetched once per flow, reused when the form is re-shown
+        self._vehicles: list[dict] | None = None
+
     async def async_step_user(self, user_input=None):
         errors = {}
         if user_input is not None:
@@ -23,9 +34,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             # Validera API-key mot backend!
             try:
-                client = EVLinkHAClient(self.hass, api_key, base_url, "dummy")
-                _LOGGER.debug("[ConfigFlow] Created EVLinkHAClient for API key validation")
-                userinfo = await client.async_get_userinfo()
+                userinfo = await async_get_userinfo(self.hass, api_key, base_url)
                 _LOGGER.debug(f"[ConfigFlow] Result from async_get_userinfo: {userinfo}")
 
                 if not userinfo:
@@ -54,8 +63,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         api_key = self.context["api_key"]
         environment = self.context["environment"]
         base_url = ENVIRONMENTS[environment]
-        client = EVLinkHAClient(self.hass, api_key, base_url, "dummy")
-        vehicles = await client.async_get_vehicles()
+        if not self._vehicles:
+            self._vehicles = await async_get_vehicles(self.hass, api_key, base_url)
+        vehicles = self._vehicles
         # Bygg lista över fordon: label → id
         choices = {}
         for v in vehicles:
@@ -90,19 +100,26 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = "no_vehicles"
         
         if user_input is not None:
-            vehicle_id = user_input[CONF_VEHICLE_ID]
-            entry_data = {
-                CONF_API_KEY: api_key,
-                CONF_ENVIRONMENT: environment,
-                CONF_VEHICLE_ID: vehicle_id,
-            }
-            _LOGGER.info("[ConfigFlow] Creating config entry with API key, environment and vehicle_id")
-            return self.async_create_entry(title="EVLinkHA", data=entry_data)
-        
+            vehicle_ids = user_input[CONF_VEHICLE_IDS]
+            if not vehicle_ids:
+                errors[CONF_VEHICLE_IDS] = "no_vehicles_selected"
+            else:
+                entry_data = {
+                    CONF_API_KEY: api_key,
+                    CONF_ENVIRONMENT: environment,
+                }
+                # One vehicle keeps the classic layout, several vehicles run in fleet mode
+                if len(vehicle_ids) == 1:
+                    entry_data[CONF_VEHICLE_ID] = vehicle_ids[0]
+                else:
+                    entry_data[CONF_VEHICLE_IDS] = list(vehicle_ids)
+                _LOGGER.info("[ConfigFlow] Creating config entry with API key, environment and %d vehicle(s)", len(vehicle_ids))
+                return self.async_create_entry(title="EVLinkHA", data=entry_data)
+
         return self.async_show_form(
             step_id="vehicle",
             data_schema=vol.Schema({
-                vol.Required(CONF_VEHICLE_ID): vol.In(choices)
+                vol.Required(CONF_VEHICLE_IDS): cv.multi_select(choices)
             }),
             errors=errors
         )
@@ -111,19 +128,37 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_reconfigure(self, user_input=None):
         entry = self._async_current_entries()[0] if self._async_current_entries() else None
         data = entry.data if entry else {}
+        # Fleet entries keep their vehicle list; only key and environment change
+        fleet = CONF_VEHICLE_IDS in data
 
+        errors = {}
         if user_input is not None and entry:
-            self.hass.config_entries.async_update_entry(entry, data=user_input)
-            _LOGGER.info("Config entry updated via reconfigure.")
-            return self.async_abort(reason="reconfigured")
-
+            base_url = ENVIRONMENTS[user_input[CONF_ENVIRONMENT]]
+            api_key = user_input[CONF_API_KEY]
+            vehicle_ids = data[CONF_VEHICLE_IDS] if fleet else [user_input[CONF_VEHICLE_ID]]
+            # Both checks are answered from the discovery cache when it is fresh
+            if not await validate_api_key(self.hass, api_key, base_url):
+                errors["api_key"] = "invalid_api_key"
+            else:
+                for vehicle_id in vehicle_ids:
+                    if not await validate_vehicle_id(self.hass, api_key, vehicle_id, base_url):
+                        errors["base" if fleet else CONF_VEHICLE_ID] = "invalid_vehicle_id"
+                        break
+            if not errors:
+                self.hass.config_entries.async_update_entry(entry, data={**data, **user_input})
+                _LOGGER.info("Config entry updated via reconfigure.")
+                return self.async_abort(reason="reconfigured")
+
+        schema = {
+            vol.Required(CONF_API_KEY, default=data.get(CONF_API_KEY, "")): str,
+            vol.Required(CONF_ENVIRONMENT, default=data.get(CONF_ENVIRONMENT, "prod")): vol.In(["prod", "sandbox"]), # <-- NY
+        }
+        if not fleet:
+            schema[vol.Required(CONF_VEHICLE_ID, default=data.get(CONF_VEHICLE_ID, ""))] = str
         return self.async_show_form(
             step_id="reconfigure",
-            data_schema=vol.Schema({
-                vol.Required(CONF_API_KEY, default=data.get(CONF_API_KEY, "")): str,
-                vol.Required(CONF_ENVIRONMENT, default=data.get(CONF_ENVIRONMENT, "prod")): vol.In(["prod", "sandbox"]), # <-- NY
-                vol.Required(CONF_VEHICLE_ID, default=data.get(CONF_VEHICLE_ID, "")): str,
-            }),
+            data_schema=vol.Schema(schema),
+            errors=errors,
         )
 
     @staticmethod
@@ -142,6 +177,26 @@ class EVLinkHAOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Required(
                     CONF_UPDATE_INTERVAL,
                     default=self.config_entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
-                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60))
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=self.config_entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+                ): bool,
+                vol.Required(
+                    CONF_PUSH_COALESCE_WINDOW,
+                    default=self.config_entry.options.get(CONF_PUSH_COALESCE_WINDOW, DEFAULT_PUSH_COALESCE_WINDOW)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=30)),
+                vol.Required(
+                    CONF_TRACKER_DISTANCE,
+                    default=self.config_entry.options.get(CONF_TRACKER_DISTANCE, DEFAULT_TRACKER_DISTANCE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+                vol.Required(
+                    CONF_TRACKER_MIN_INTERVAL,
+                    default=self.config_entry.options.get(CONF_TRACKER_MIN_INTERVAL, DEFAULT_TRACKER_MIN_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Required(
+                    CONF_STREAMING,
+                    default=self.config_entry.options.get(CONF_STREAMING, DEFAULT_STREAMING)
+                ): bool,
             }),
         )
@@ -4,8 +4,99 @@ DOMAIN           = "evlinkha"
 CONF_API_KEY     = "api_key"
 CONF_ENVIRONMENT = "environment"
 CONF_VEHICLE_ID  = "vehicle_id"
+CONF_VEHICLE_IDS = "vehicle_ids"   # fleet mode: many vehicles in one entry
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_PUSH_COALESCE_WINDOW = "push_coalesce_window"
 DEFAULT_UPDATE_INTERVAL = 6
+DEFAULT_FLEET_CONCURRENCY = 4      # parallel status requests per fleet poll
+DEFAULT_ADAPTIVE_POLLING = True
+DEFAULT_PUSH_COALESCE_WINDOW = 1.0 # seconds webhook pushes are collected before applying
+PUSH_MAX_PENDING = 50              # pending pushes that force an early flush
+
+# Outbound event stream (SSE) as an alternative to the inbound webhook
+CONF_STREAMING = "streaming"
+DEFAULT_STREAMING = False
+STREAM_HEARTBEAT_TIMEOUT = 45     # seconds without any bytes before reconnecting
+STREAM_BACKOFF_BASE      = 2      # seconds, first reconnect delay
+STREAM_BACKOFF_MAX       = 300    # seconds
+STREAM_SAFETY_INTERVAL   = 1800   # seconds, slowest poll while the stream is healthy
+
+# Device tracker: location writes need this much movement and time in between
+CONF_TRACKER_DISTANCE = "tracker_distance"
+CONF_TRACKER_MIN_INTERVAL = "tracker_min_interval"
+DEFAULT_TRACKER_DISTANCE = 50        # meters
+DEFAULT_TRACKER_MIN_INTERVAL = 60    # seconds
+ZONE_CELL_DEG = 0.0005               # zone lookups cached per cell (~50 m)
+ZONE_CACHE_TTL = 600                 # seconds
+
+METRICS_SAMPLES = 256   # latency samples kept per endpoint for percentiles
+METRICS_UPDATE_INTERVAL = 30  # seconds between metric sensor updates
+
+TELEMETRY_CAPACITY = 4096   # samples kept per vehicle (~100 kB)
+
+ANALYTICS_EWMA_TAU = 600    # seconds, time constant of the charge rate average
+
+# Derived charging analytics sensors (analytics.py)
+ANALYTICS_FIELDS = {
+    "session_energy": ("Session Energy Added", "kWh"),
+    "charge_rate_ewma": ("Average Charge Rate", "kW"),
+    "time_to_limit": ("Time To Charge Limit", "min"),
+    "efficiency": ("Efficiency", "km/kWh"),
+}
+
+DISCOVERY_TTL = 300     # seconds userinfo/vehicle lists are reused by config flows
+
+# Static tier: these status blocks rarely change; they are refreshed at
+# most once per STATIC_TIER_TTL and persisted with the snapshot
+STATIC_TIER_TTL = 6 * 3600   # seconds
+STATIC_STATUS_KEYS = ("information", "capabilities", "vendor")
+# Userinfo (/me) is slower than the vehicles but not static: sms_credits
+# drops with every SMS sent. A conditional GET, mostly answered with 304
+USER_REFRESH_INTERVAL = 15 * 60   # seconds
+
+# Last-known-state snapshot in .storage
+SNAPSHOT_VERSION    = 1
+SNAPSHOT_SAVE_DELAY = 30   # seconds, debounce for snapshot writes
+
+# Charging commands: optimistic state shown until the vehicle confirms it
+CHARGING_CONFIRM_DELAY = 15   # seconds before the confirming status poll
+CHARGING_FANOUT_CONCURRENCY = 16  # commands in flight for one set_charging call
+CHARGING_OPTIMISTIC = {
+    "START": {"chargingState": "CHARGING",
+              "chargeState": {"isCharging": True, "powerDeliveryState": "PLUGGED_IN:CHARGING"}},
+    "STOP":  {"chargingState": "IDLE",
+              "chargeState": {"isCharging": False, "powerDeliveryState": "PLUGGED_IN:STOPPED"}},
+}
+
+# Adaptive polling: multiplier on the configured interval per vehicle state
+ADAPTIVE_CHARGING_FACTOR    = 0.25
+ADAPTIVE_PLUGGED_FACTOR     = 0.5
+ADAPTIVE_IDLE_FACTOR        = 2.0  # per consecutive idle poll, up to ADAPTIVE_IDLE_MAX_STEPS
+ADAPTIVE_IDLE_MAX_STEPS     = 3
+ADAPTIVE_UNREACHABLE_FACTOR = 4.0
+ADAPTIVE_MIN_INTERVAL       = 60    # seconds
+ADAPTIVE_MAX_INTERVAL       = 3600  # seconds
+
+# HTTP connection pool (one keep-alive session per environment)
+HTTP_TIMEOUT            = 15   # seconds, total per request
+HTTP_CONNECT_TIMEOUT    = 5    # seconds, TCP + TLS handshake
+HTTP_POOL_LIMIT         = 20   # max open connections per session
+HTTP_POOL_LIMIT_PER_HOST = CHARGING_FANOUT_CONCURRENCY + DEFAULT_FLEET_CONCURRENCY  # a set_charging fan-out next to a fleet poll
+HTTP_DNS_CACHE_TTL      = 300  # seconds
+HTTP_KEEPALIVE_TIMEOUT  = 60   # seconds an idle connection is kept open
+HTTP_REUSE_TTL          = 2    # seconds a successful GET answers identical GETs (0 = off)
+
+# Client-side rate limit (token bucket shared per API key)
+# The bucket only engages once the API sends limit headers or a 429/503
+RATE_LIMIT_PER_MINUTE       = 30   # refill rate until the API reports its X-RateLimit-Limit
+RATE_LIMIT_WINDOW           = 60   # seconds X-RateLimit-Limit counts over without a RateLimit-Policy
+RATE_LIMIT_BURST            = 10
+RATE_LIMIT_COMMAND_BURST    = 2 * CHARGING_FANOUT_CONCURRENCY  # charging commands' own bucket
+RATE_LIMIT_POLL_MAX_WAIT    = 0    # seconds a poll may wait before it is deferred (0: defer at once)
+RATE_LIMIT_COMMAND_MAX_WAIT = 30   # seconds a command may wait for a token
+RATE_LIMIT_BACKOFF_BASE     = 30   # seconds, first backoff without Retry-After
+RATE_LIMIT_BACKOFF_MAX      = 1800 # seconds
 
 WEBHOOK_ID = f"{DOMAIN}_push_webhook"
 
@@ -46,6 +137,16 @@ ICONS = {
     "vendor": "mdi:factory",
     "smartChargingPolicy.isEnabled": "mdi:flash-auto",
     "smartChargingPolicy.minimumChargeLimit": "mdi:battery-10",
+    "requests": "mdi:swap-vertical",
+    "latency_p95": "mdi:timer-outline",
+    "errors": "mdi:alert-circle-outline",
+    "rate_limited": "mdi:speedometer-slow",
+    "pushes": "mdi:webhook",
+    "push_p95": "mdi:timer-cog-outline",
+    "session_energy": "mdi:battery-plus",
+    "charge_rate_ewma": "mdi:chart-bell-curve-cumulative",
+    "time_to_limit": "mdi:timer-sand-complete",
+    "efficiency": "mdi:leaf",
 }
 
 USER_FIELDS = {
@@ -56,6 +157,16 @@ USER_FIELDS = {
     "sms_credits": ("SMS Credits", "count"),
 }
 
+# Client instrumentation (ClientMetrics.summary), diagnostic category
+METRIC_FIELDS = {
+    "requests": ("API Requests", None),
+    "latency_p95": ("API Latency p95", "ms"),
+    "errors": ("API Errors", None),
+    "rate_limited": ("API Rate Limited", None),
+    "pushes": ("Push Updates", None),
+    "push_p95": ("Push Processing p95", "ms"),
+}
+
 WEBHOOK_FIELDS = {
     "webhookId": ("Webhook ID", None),
 }
@@ -86,3 +197,9 @@ VEHICLE_FIELDS = {
     "smartChargingPolicy.isEnabled": ("Smart Charging Enabled", None),
     "smartChargingPolicy.minimumChargeLimit": ("Min Charge Limit", "%"),
 }
+
+# Shown instead of None (Unknown) for these vehicle fields
+VEHICLE_NULL_VALUES = {
+    "chargeState.chargeRate": "--",
+    "chargeState.chargeTimeRemaining": "--",
+}
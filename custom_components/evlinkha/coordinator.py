@@ -0,0 +1,422 @@
+# custom_components/evlinkha/coordinator.py
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    DOMAIN, DEFAULT_FLEET_CONCURRENCY,
+    ADAPTIVE_CHARGING_FACTOR, ADAPTIVE_PLUGGED_FACTOR,
+    ADAPTIVE_IDLE_FACTOR, ADAPTIVE_IDLE_MAX_STEPS, ADAPTIVE_UNREACHABLE_FACTOR,
+    ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL, STREAM_SAFETY_INTERVAL,
+    STATIC_TIER_TTL, STATIC_STATUS_KEYS, USER_REFRESH_INTERVAL,
+    VEHICLE_FIELDS, VEHICLE_NULL_VALUES,
+)
+from .api import EVLinkHAClient, EVLinkHARateLimited
+from .helpers.fields import FieldTable
+from .model import EMPTY_STATE, VehicleState
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def is_static_field(field: str) -> bool:
+    """True for fields in the static tier (information.*, vendor, ...)."""
+    return field.split(".", 1)[0] in STATIC_STATUS_KEYS
+
+
+# VEHICLE_FIELDS compiled once, shared by every coordinator and sensor:
+# dynamic fields are flattened per status, static ones per static blocks
+VEHICLE_FIELD_TABLE = FieldTable(
+    [f for f in VEHICLE_FIELDS if not is_static_field(f)], VEHICLE_NULL_VALUES
+)
+STATIC_FIELD_TABLE = FieldTable(
+    [f for f in VEHICLE_FIELDS if is_static_field(f)], VEHICLE_NULL_VALUES
+)
+
+
+def _diff_table(prev: dict | None, table: dict) -> set[str]:
+    if prev is table:
+        return set()
+    if prev is None:
+        return set(table)
+    return {f for f, val in table.items() if prev.get(f) != val}
+
+
+class EVLinkHAUserCoordinator(DataUpdateCoordinator):
+    """
+    Userinfo (/me) coordinator, the slow tier.
+
+    Tier, email and role almost never change, but sms_credits does, so /me
+    is fetched every USER_REFRESH_INTERVAL rather than at the vehicle pace
+    or once per STATIC_TIER_TTL. `fetched_at` (epoch) is persisted with the
+    snapshot: a restart within the interval starts from the stored
+    userinfo without a request. A failed fetch keeps the last known
+    userinfo.
+    """
+
+    def __init__(self, hass, client: EVLinkHAClient, ttl: float = USER_REFRESH_INTERVAL):
+        super().__init__(
+            hass, _LOGGER,
+            name=f"{DOMAIN} user info",
+            update_interval=timedelta(seconds=ttl),
+            always_update=False,
+        )
+        self.client = client
+        self.fetched_at: float | None = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self.data is not None and self.fetched_at is not None
+            and time.time() - self.fetched_at < self.update_interval.total_seconds()
+        )
+
+    async def _async_update_data(self) -> dict | None:
+        data = await self.client.async_get_userinfo()
+        if data is None:
+            return self.data
+        self.fetched_at = time.time()
+        return data
+
+
+class EVLinkHAVehicleCoordinator(DataUpdateCoordinator):
+    """
+    Vehicle status coordinator for one config entry.
+
+    Polls every configured vehicle in one cycle, at most `concurrency`
+    requests in flight at a time, so a fleet poll takes roughly
+    ceil(vehicles / concurrency) round trips instead of one per vehicle.
+
+    `data` is keyed by vehicle_id: {vehicle_id: VehicleState | None}.
+    A vehicle whose poll fails keeps its last known status. A poll answered
+    with 304 Not Modified yields the identical status object, so a cycle
+    without changes compares equal and does not notify listeners.
+
+    With adaptive polling every vehicle has its own due time, derived from
+    its charge state, and a webhook push counts as a poll. The coordinator
+    timer is re-armed for the earliest due vehicle and only due vehicles
+    are fetched by the timer. A refresh that was asked for (async_refresh,
+    async_request_refresh: update_entity, services) polls every vehicle.
+
+    While an event stream is healthy (`streaming`) polls are only a safety
+    net: the base interval is raised to at least STREAM_SAFETY_INTERVAL.
+
+    The static blocks of a status (STATIC_STATUS_KEYS) form a slow tier:
+    for STATIC_TIER_TTL after they were last taken from a poll, polls
+    reuse the current blocks instead of parsing the ones they carry
+    (`static_fetched`, epoch per vehicle, is persisted with the snapshot).
+    Pushes still apply to them at once. Static sensors read
+    static_fields(), which is only rebuilt and diffed when the blocks change.
+    """
+
+    def __init__(
+        self,
+        hass,
+        client: EVLinkHAClient,
+        vehicle_ids: list[str],
+        update_interval: timedelta,
+        fleet: bool = False,
+        concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+        adaptive: bool = True,
+    ):
+        super().__init__(
+            hass, _LOGGER,
+            name=f"{DOMAIN} vehicle status",
+            update_interval=update_interval,
+            # Unchanged polls (304 -> same objects) do not notify listeners
+            always_update=False,
+        )
+        self.client = client
+        self.vehicle_ids = list(vehicle_ids)
+        # Legacy entries (one CONF_VEHICLE_ID) keep their original device and unique ids
+        self.fleet = fleet
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.adaptive = adaptive
+        self._base_interval = update_interval
+        self.streaming = False
+        self._next_poll: dict[str, float] = {}    # vehicle_id -> monotonic due time
+        self._force = False                        # requested refresh: every vehicle is due
+        self._idle_streak: dict[str, int] = {}
+        self.static_fetched: dict[str, float] = {}
+        # vehicle_id -> (status object the table was built from, flat field table)
+        self._field_tables: dict[str, tuple[VehicleState | None, dict]] = {}
+        # vehicle_id -> (information block, vendor, flat static field table)
+        self._static_tables: dict[str, tuple] = {}
+        # Per-field diff against the (dynamic, static) tables listeners saw last time
+        self._notified_tables: dict[str, tuple[dict, dict]] = {}
+        self._changed_fields: dict[str, set[str]] = {}
+        self.entity_writes = {"written": 0, "suppressed": 0}
+
+    def vehicle_data(self, vehicle_id: str) -> VehicleState:
+        """Latest status for one vehicle (EMPTY_STATE if unknown)."""
+        return (self.data or {}).get(vehicle_id) or EMPTY_STATE
+
+    def vehicle_fields(self, vehicle_id: str) -> dict:
+        """
+        Flat {field: value} table for one vehicle's dynamic VEHICLE_FIELDS.
+        Built once per new status object; every sensor then reads it in O(1).
+        """
+        status = (self.data or {}).get(vehicle_id)
+        cached = self._field_tables.get(vehicle_id)
+        if cached is None or cached[0] is not status:
+            cached = self._field_tables[vehicle_id] = (status, VEHICLE_FIELD_TABLE.flatten(status))
+        return cached[1]
+
+    def static_fields(self, vehicle_id: str) -> dict:
+        """Flat table of the static-tier fields, rebuilt only when those blocks change."""
+        status = self.vehicle_data(vehicle_id)
+        cached = self._static_tables.get(vehicle_id)
+        if cached is None or cached[0] is not status.information or cached[1] != status.vendor:
+            cached = self._static_tables[vehicle_id] = (
+                status.information, status.vendor, STATIC_FIELD_TABLE.flatten(status)
+            )
+        return cached[2]
+
+    def _diff_fields(self) -> None:
+        """Record which fields changed per vehicle since the last notification."""
+        for vid in self.vehicle_ids:
+            table, static = self.vehicle_fields(vid), self.static_fields(vid)
+            prev, prev_static = self._notified_tables.get(vid, (None, None))
+            self._changed_fields[vid] = _diff_table(prev, table) | _diff_table(prev_static, static)
+            self._notified_tables[vid] = (table, static)
+
+    def fields_changed(self, vehicle_id: str, fields) -> bool:
+        """True if any of `fields` changed for the vehicle in the current update."""
+        changed = self._changed_fields.get(vehicle_id)
+        return changed is None or not changed.isdisjoint(fields)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Diff the new snapshot per field before entities decide to write."""
+        self._diff_fields()
+        super().async_update_listeners()
+
+    def _vehicle_interval(self, vehicle_id: str, status: VehicleState | None) -> float:
+        """Seconds until the next poll of a vehicle, based on its last status."""
+        base = self._effective_interval().total_seconds()
+        status = status or EMPTY_STATE
+
+        if status.is_reachable is False:
+            interval = base * ADAPTIVE_UNREACHABLE_FACTOR
+        elif status.is_charging:
+            interval = base * ADAPTIVE_CHARGING_FACTOR
+        elif status.is_plugged_in:
+            interval = base * ADAPTIVE_PLUGGED_FACTOR
+        else:
+            steps = min(self._idle_streak.get(vehicle_id, 0), ADAPTIVE_IDLE_MAX_STEPS)
+            interval = base * ADAPTIVE_IDLE_FACTOR ** steps
+        return min(max(interval, ADAPTIVE_MIN_INTERVAL), ADAPTIVE_MAX_INTERVAL)
+
+    def _schedule_vehicle(self, vehicle_id: str, status: VehicleState | None) -> None:
+        status = status or EMPTY_STATE
+        if not status.is_charging and not status.is_plugged_in:
+            self._idle_streak[vehicle_id] = self._idle_streak.get(vehicle_id, 0) + 1
+        else:
+            self._idle_streak[vehicle_id] = 0
+        self._next_poll[vehicle_id] = time.monotonic() + self._vehicle_interval(vehicle_id, status)
+
+    def _effective_interval(self) -> timedelta:
+        """The configured interval, relaxed while the event stream is healthy."""
+        if self.streaming:
+            return max(self._base_interval, timedelta(seconds=STREAM_SAFETY_INTERVAL))
+        return self._base_interval
+
+    def _rearm(self) -> None:
+        """Point the coordinator timer at the earliest due vehicle."""
+        if not self._next_poll:
+            self.update_interval = self._effective_interval()
+            return
+        wait = min(self._next_poll.values()) - time.monotonic()
+        self.update_interval = timedelta(seconds=max(wait, ADAPTIVE_MIN_INTERVAL))
+
+    @callback
+    def async_apply_options(self, update_interval: timedelta, adaptive: bool) -> None:
+        """
+        Apply changed polling options to the running coordinator.
+        Due times are recomputed from the data at hand; nothing is fetched.
+        """
+        if update_interval == self._base_interval and adaptive == self.adaptive:
+            return
+        self._base_interval = update_interval
+        self.adaptive = adaptive
+        self._reschedule()
+        _LOGGER.debug("Options applied: interval %s, adaptive %s", update_interval, adaptive)
+
+    @callback
+    def async_set_streaming(self, healthy: bool) -> None:
+        """The event stream came up or went down: switch polling pace."""
+        if healthy == self.streaming:
+            return
+        self.streaming = healthy
+        self._reschedule()
+        _LOGGER.debug("Event stream %s, polling every %s",
+                      "healthy" if healthy else "down", self._effective_interval())
+
+    def _reschedule(self) -> None:
+        """Recompute due times from the data at hand and re-arm the timer."""
+        if self.adaptive:
+            for vid in self.vehicle_ids:
+                self._next_poll[vid] = time.monotonic() + self._vehicle_interval(vid, self.vehicle_data(vid))
+            self._rearm()
+        else:
+            self._next_poll.clear()
+            self._idle_streak.clear()
+            self.update_interval = self._effective_interval()
+        if self._listeners:
+            # Re-arm the pending timer with the new interval
+            self._schedule_refresh()
+
+    @callback
+    def async_note_push(self, vehicle_id: str, status: VehicleState) -> None:
+        """A webhook delivered fresh data: treat it as this vehicle's poll."""
+        if not self.adaptive:
+            return
+        self._schedule_vehicle(vehicle_id, status)
+        _LOGGER.debug("Push for %s, next poll in %.0f s", vehicle_id,
+                      self._next_poll[vehicle_id] - time.monotonic())
+
+    @callback
+    def async_apply_pushes(
+        self, patches: dict[str, list[dict]], as_poll: bool = True
+    ) -> dict[str, set[str]]:
+        """
+        Deep-merge partial vehicle updates into the current statuses
+        (VehicleState.merge: copy-on-write, untouched blocks are shared).
+
+        `patches` maps vehicle_id to the pushes received for it, oldest
+        first. All vehicles are applied as one coordinator update, and
+        listeners are only notified when something actually changed.
+        With `as_poll=False` (local, optimistic state) the vehicle's poll
+        schedule is left alone.
+        Returns the changed dotted paths per vehicle.
+        """
+        data = None
+        all_changes = {}
+        for vehicle_id, patch_list in patches.items():
+            state = self.vehicle_data(vehicle_id)
+            changes: set[str] = set()
+            for patch in patch_list:
+                state, patch_changes = state.merge(patch)
+                changes |= patch_changes
+            # The push also counts as this vehicle's poll
+            if as_poll:
+                self.async_note_push(vehicle_id, state)
+            if changes:
+                if data is None:
+                    data = dict(self.data or {})
+                data[vehicle_id] = state
+            all_changes[vehicle_id] = changes
+            _LOGGER.debug("Push for %s changed %d path(s): %s", vehicle_id, len(changes), sorted(changes))
+
+        if data is not None:
+            # async_set_updated_data re-arms the timer a full interval from
+            # now; aim it at the earliest due vehicle so other vehicles'
+            # polls are not postponed by this one's push
+            if self.adaptive:
+                self._rearm()
+            self.async_set_updated_data(data)
+        return all_changes
+
+    @callback
+    def async_apply_push(self, vehicle_id: str, patch: dict, as_poll: bool = True) -> set[str]:
+        """Apply a single partial update; see async_apply_pushes."""
+        return self.async_apply_pushes({vehicle_id: [patch]}, as_poll)[vehicle_id]
+
+    async def async_refresh(self) -> None:
+        """
+        Refresh on request; every vehicle is polled, due or not.
+        (The coordinator timer does not come through here, and the
+        request_refresh debouncer calls this method.)
+        """
+        self._force = True
+        try:
+            await super().async_refresh()
+        finally:
+            self._force = False
+
+    async def async_refresh_vehicle(self, vehicle_id: str) -> bool:
+        """
+        Poll one vehicle now, outside the regular cycle.
+        Other vehicles and their schedules are untouched. Returns True if
+        a status was received.
+        """
+        try:
+            _, status = await self._async_fetch_vehicle(vehicle_id)
+        except EVLinkHARateLimited as err:
+            _LOGGER.debug("Refresh of vehicle %s deferred: %s", vehicle_id, err)
+            return False
+        if status is None:
+            return False
+        if self.adaptive:
+            self._schedule_vehicle(vehicle_id, status)
+            self._rearm()
+        if status is not self.vehicle_data(vehicle_id):
+            self.async_set_updated_data({**(self.data or {}), vehicle_id: status})
+        return True
+
+    def _due_vehicles(self) -> list[str]:
+        if not self.adaptive or self._force:
+            return self.vehicle_ids
+        now = time.monotonic()
+        # Small slack so vehicles due right after this tick join it
+        return [
+            vid for vid in self.vehicle_ids
+            if self._next_poll.get(vid, 0) <= now + ADAPTIVE_MIN_INTERVAL / 2
+        ]
+
+    async def _async_fetch_vehicle(self, vehicle_id: str):
+        previous = (self.data or {}).get(vehicle_id)
+        fetched = self.static_fetched.get(vehicle_id)
+        # Within the static TTL the current static blocks are reused as they are;
+        # past it a full (unconditional) GET re-takes them, since a 304 would
+        # hand back the cached object with the reused blocks still in it
+        reuse = previous if previous and fetched and time.time() - fetched < STATIC_TIER_TTL else None
+        async with self._semaphore:
+            status = await self.client.async_get_vehicle_status(
+                vehicle_id, static=reuse, refresh_static=reuse is None
+            )
+        if status is not None and reuse is None:
+            self.static_fetched[vehicle_id] = time.time()
+        return vehicle_id, status
+
+    async def _async_update_data(self) -> dict:
+        old = self.data or {}
+        due = self._due_vehicles()
+        if not due:
+            _LOGGER.debug("No vehicle due for polling, skipping this cycle")
+            self._rearm()
+            return old
+
+        results = await asyncio.gather(
+            *(self._async_fetch_vehicle(vid) for vid in due),
+            return_exceptions=True,
+        )
+
+        data = dict(old)
+        for vid, result in zip(due, results):
+            if isinstance(result, EVLinkHARateLimited):
+                # Deferred by the rate limiter: retry when the limiter allows it
+                _LOGGER.debug("Status poll for vehicle %s deferred: %s", vid, result)
+                data.setdefault(vid, None)
+                self._next_poll[vid] = time.monotonic() + max(result.retry_after, ADAPTIVE_MIN_INTERVAL)
+                continue
+            if isinstance(result, BaseException):
+                _LOGGER.warning("Status poll for vehicle %s failed: %s", vid, result)
+                status = None
+            else:
+                status = result[1]
+            if status is not None:
+                data[vid] = status
+            else:
+                data.setdefault(vid, None)
+            if self.adaptive:
+                self._schedule_vehicle(vid, data[vid])
+
+        if self.adaptive:
+            self._rearm()
+        _LOGGER.debug("Fleet poll finished for %d of %d vehicles", len(due), len(self.vehicle_ids))
+        return data
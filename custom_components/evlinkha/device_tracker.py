@@ -0,0 +1,158 @@
+# custom_components/evlinkha/device_tracker.py
+
+import logging
+import time
+
+from homeassistant.components.device_tracker import SourceType
+from homeassistant.components.device_tracker.config_entry import TrackerEntity
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DOMAIN,
+    CONF_TRACKER_DISTANCE, CONF_TRACKER_MIN_INTERVAL,
+    DEFAULT_TRACKER_DISTANCE, DEFAULT_TRACKER_MIN_INTERVAL,
+    ZONE_CELL_DEG, ZONE_CACHE_TTL,
+)
+from .entity import EVLinkHAVehicleEntity, vehicle_name_prefix, vehicle_unique_prefix
+from .helpers.geo import ZoneResolver, haversine_m
+
+_LOGGER = logging.getLogger(__name__)
+
+LOCATION_FIELDS = ("location.latitude", "location.longitude")
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up one device tracker per vehicle on the vehicle coordinator."""
+    vehicle_coordinator = hass.data[DOMAIN].get(f"{entry.entry_id}_vehicle")
+    if not vehicle_coordinator:
+        return
+    zones = ZoneResolver(hass, ZONE_CELL_DEG, ZONE_CACHE_TTL)
+    async_add_entities(
+        EVLinkHADeviceTracker(vehicle_coordinator, entry, vehicle_id, zones)
+        for vehicle_id in vehicle_coordinator.vehicle_ids
+    )
+
+
+class EVLinkHADeviceTracker(EVLinkHAVehicleEntity, TrackerEntity):
+    """
+    GPS tracker for one vehicle.
+
+    The reported position only moves when the vehicle moved at least
+    `distance` meters (haversine) from it, and at most once per
+    `min_interval` seconds; a move inside the interval is written when
+    the interval ends. GPS jitter of a parked car therefore writes
+    nothing. The zone state is resolved through a per-cell cache.
+    """
+
+    _watched_fields = LOCATION_FIELDS
+
+    def __init__(self, coordinator, entry, vehicle_id, zones: ZoneResolver):
+        super().__init__(coordinator, entry, vehicle_id)
+        self._zones = zones
+        self._written_at = 0.0
+        self._unsub_deferred = None
+        self._position: tuple[float, float] | None = self._reported_position()
+
+    def _reported_position(self) -> tuple[float, float] | None:
+        loc = self.coordinator.vehicle_data(self._vehicle_id).location
+        if loc is None or loc.latitude is None or loc.longitude is None:
+            return None
+        return float(loc.latitude), float(loc.longitude)
+
+    # Read from the options on use, so changed options apply without a reload
+    @property
+    def _distance(self) -> float:
+        return self._entry.options.get(CONF_TRACKER_DISTANCE, DEFAULT_TRACKER_DISTANCE)
+
+    @property
+    def _min_interval(self) -> float:
+        return self._entry.options.get(CONF_TRACKER_MIN_INTERVAL, DEFAULT_TRACKER_MIN_INTERVAL)
+
+    @property
+    def name(self) -> str:
+        return f"{vehicle_name_prefix(self.coordinator, self._vehicle_id)} Tracker"
+
+    @property
+    def unique_id(self) -> str:
+        prefix = vehicle_unique_prefix(self.coordinator, self._entry, self._vehicle_id)
+        return f"{prefix}-tracker"
+
+    @property
+    def icon(self) -> str:
+        return "mdi:car-electric"
+
+    @property
+    def source_type(self) -> SourceType:
+        return SourceType.GPS
+
+    @property
+    def force_update(self) -> bool:
+        # Unchanged positions are not worth a state_changed event
+        return False
+
+    @property
+    def latitude(self) -> float | None:
+        return self._position[0] if self._position else None
+
+    @property
+    def longitude(self) -> float | None:
+        return self._position[1] if self._position else None
+
+    @property
+    def location_name(self) -> str | None:
+        if self._position is None:
+            return None
+        return self._zones.resolve(*self._position, self.location_accuracy)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        if available != self._written_available:
+            self._write(self._reported_position() or self._position)
+            return
+        if not self.coordinator.fields_changed(self._vehicle_id, self._watched_fields):
+            self.coordinator.entity_writes["suppressed"] += 1
+            return
+
+        new = self._reported_position()
+        if new is None or (
+            self._position is not None and haversine_m(*self._position, *new) < self._distance
+        ):
+            # Jitter around the reported position
+            self.coordinator.entity_writes["suppressed"] += 1
+            return
+
+        wait = self._written_at + self._min_interval - time.monotonic()
+        if wait > 0:
+            self.coordinator.entity_writes["suppressed"] += 1
+            if self._unsub_deferred is None:
+                self._unsub_deferred = async_call_later(self.hass, wait, self._async_deferred_write)
+            return
+        self._write(new)
+
+    @callback
+    def _async_deferred_write(self, _now) -> None:
+        self._unsub_deferred = None
+        new = self._reported_position()
+        if new is not None and (
+            self._position is None or haversine_m(*self._position, *new) >= self._distance
+        ):
+            self._write(new)
+
+    @callback
+    def _write(self, position: tuple[float, float] | None) -> None:
+        if self._unsub_deferred is not None:
+            self._unsub_deferred()
+            self._unsub_deferred = None
+        self._position = position
+        self._written_at = time.monotonic()
+        self._written_available = self.available
+        self.coordinator.entity_writes["written"] += 1
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_deferred is not None:
+            self._unsub_deferred()
+            self._unsub_deferred = None
+        await super().async_will_remove_from_hass()
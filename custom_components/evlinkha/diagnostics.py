@@ -0,0 +1,56 @@
+# custom_components/evlinkha/diagnostics.py
+
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DOMAIN, CONF_API_KEY
+
+TO_REDACT = {
+    CONF_API_KEY, "vin", "email", "name", "latitude", "longitude", "webhookId",
+}
+
+
+async def async_get_config_entry_diagnostics(hass, entry) -> dict:
+    """Diagnostics download: client metrics, scheduler state and last data."""
+    domain_data = hass.data.get(DOMAIN, {})
+    user_coord = domain_data.get(entry.entry_id)
+    vehicle_coord = domain_data.get(f"{entry.entry_id}_vehicle")
+    push = domain_data.get(f"{entry.entry_id}_push")
+    commands = domain_data.get(f"{entry.entry_id}_commands")
+    stream = domain_data.get(f"{entry.entry_id}_stream")
+
+    diag = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+    }
+    if vehicle_coord is not None:
+        diag["metrics"] = vehicle_coord.client.metrics.as_dict()
+        diag["single_flight"] = dict(vehicle_coord.client.flights.stats)
+        diag["vehicle_coordinator"] = {
+            "last_update_success": vehicle_coord.last_update_success,
+            "update_interval_s": (
+                vehicle_coord.update_interval.total_seconds()
+                if vehicle_coord.update_interval else None
+            ),
+            "adaptive": vehicle_coord.adaptive,
+            "static_fetched": dict(vehicle_coord.static_fetched),
+            "entity_writes": dict(vehicle_coord.entity_writes),
+            "data": async_redact_data(
+                {
+                    vid: status.as_dict() if status is not None else None
+                    for vid, status in (vehicle_coord.data or {}).items()
+                },
+                TO_REDACT,
+            ),
+        }
+    if push is not None:
+        diag["push"] = dict(push.stats)
+    if commands is not None:
+        diag["charging_commands"] = dict(commands.stats)
+    if stream is not None:
+        diag["stream"] = {"healthy": stream.healthy, **stream.stats}
+    if user_coord is not None:
+        diag["user"] = async_redact_data(user_coord.data or {}, TO_REDACT)
+        diag["user_fetched"] = user_coord.fetched_at
+    return diag
@@ -0,0 +1,80 @@
+# custom_components/evlinkha/entity.py
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .model import Information
+
+EMPTY_INFORMATION = Information()
+
+
+def hub_device_info(entry) -> DeviceInfo:
+    return {
+        "identifiers": {(DOMAIN, entry.entry_id)},
+        "name": "EVLinkHA",
+        "manufacturer": "Roger Aspelin",
+        "model": "EVLinkHA Integration",
+    }
+
+
+def vehicle_device_info(coordinator, entry, vehicle_id) -> DeviceInfo:
+    """Legacy entries share the hub device; fleet vehicles get one device each."""
+    if not coordinator.fleet:
+        return hub_device_info(entry)
+    data = coordinator.vehicle_data(vehicle_id)
+    info = data.information or EMPTY_INFORMATION
+    return {
+        "identifiers": {(DOMAIN, f"{entry.entry_id}-{vehicle_id}")},
+        "name": info.display_name or data.vehicle_name or vehicle_id,
+        "manufacturer": info.brand or "EVLinkHA",
+        "model": info.model or "Vehicle",
+        "via_device": (DOMAIN, entry.entry_id),
+    }
+
+
+def vehicle_name_prefix(coordinator, vehicle_id) -> str:
+    if not coordinator.fleet:
+        return "EVLinkHA"
+    return f"EVLinkHA {coordinator.vehicle_data(vehicle_id).vehicle_name or vehicle_id}"
+
+
+def vehicle_unique_prefix(coordinator, entry, vehicle_id) -> str:
+    if not coordinator.fleet:
+        return f"{DOMAIN}-{entry.entry_id}"
+    return f"{DOMAIN}-{entry.entry_id}-{vehicle_id}"
+
+
+class EVLinkHAVehicleEntity(CoordinatorEntity):
+    """
+    Base for entities bound to one vehicle of the vehicle coordinator.
+
+    State is only written when one of `_watched_fields` changed in the
+    coordinator's per-field diff, or when availability flipped; every
+    skipped write is counted in coordinator.entity_writes.
+    """
+
+    _watched_fields: tuple[str, ...] = ()
+
+    def __init__(self, coordinator, entry, vehicle_id):
+        super().__init__(coordinator)
+        self._entry = entry
+        self._vehicle_id = vehicle_id
+        self._written_available = None
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return vehicle_device_info(self.coordinator, self._entry, self._vehicle_id)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        if available != self._written_available or self.coordinator.fields_changed(
+            self._vehicle_id, self._watched_fields
+        ):
+            self._written_available = available
+            self.coordinator.entity_writes["written"] += 1
+            self.async_write_ha_state()
+        else:
+            self.coordinator.entity_writes["suppressed"] += 1
@@ -0,0 +1,101 @@
+# custom_components/evlinkha/helpers/discovery.py
+
+import asyncio
+import logging
+import time
+
+from ..api import EVLinkHAClient, discard_key_state
+from ..const import CONF_API_KEY, DOMAIN, DISCOVERY_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+DISCOVERY = "discovery"
+
+
+class _Discovery:
+    """Userinfo and vehicle list of one API key in one environment."""
+
+    __slots__ = ("client", "lock", "userinfo", "userinfo_at", "vehicles", "vehicles_at")
+
+    def __init__(self, client: EVLinkHAClient):
+        self.client = client
+        self.lock = asyncio.Lock()
+        self.userinfo: dict | None = None
+        self.userinfo_at = 0.0
+        self.vehicles: list[dict] | None = None
+        self.vehicles_at = 0.0
+
+    def is_stale(self, now: float) -> bool:
+        """Nothing fresh to serve and no lookup running."""
+        return (
+            not self.lock.locked()
+            and (self.userinfo is None or now - self.userinfo_at >= DISCOVERY_TTL)
+            and (self.vehicles is None or now - self.vehicles_at >= DISCOVERY_TTL)
+        )
+
+
+def _cache(hass) -> dict:
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DISCOVERY, {})
+
+
+def _get(hass, api_key: str, base_url: str) -> _Discovery:
+    # An entry only lives while a lookup runs or it holds fresh data, so
+    # rejected keys and old results do not pile up (see _evict)
+    cache = _cache(hass)
+    key = (api_key, base_url.rstrip("/"))
+    if key not in cache:
+        cache[key] = _Discovery(EVLinkHAClient(hass, api_key, base_url, "dummy"))
+    return cache[key]
+
+
+def _evict(hass) -> None:
+    cache = _cache(hass)
+    now = time.monotonic()
+    evicted = {key for key, entry in cache.items() if entry.is_stale(now)}
+    for key in evicted:
+        del cache[key]
+    # The per-key rate limiter and single-flight go with the last user of the key
+    in_use = {api_key for api_key, _ in cache}
+    in_use.update(entry.data.get(CONF_API_KEY) for entry in hass.config_entries.async_entries(DOMAIN))
+    for api_key in {api_key for api_key, _ in evicted} - in_use:
+        discard_key_state(hass, api_key)
+
+
+async def async_get_userinfo(hass, api_key: str, base_url: str) -> dict | None:
+    """
+    Userinfo for an API key, reused for DISCOVERY_TTL seconds.
+    Only successful lookups are cached, so a corrected key is retried.
+    """
+    entry = _get(hass, api_key, base_url)
+    async with entry.lock:
+        if entry.userinfo is not None and time.monotonic() - entry.userinfo_at < DISCOVERY_TTL:
+            _LOGGER.debug("[Discovery] Userinfo served from cache")
+            return entry.userinfo
+        userinfo = await entry.client.async_get_userinfo()
+        if userinfo:
+            entry.userinfo, entry.userinfo_at = userinfo, time.monotonic()
+    _evict(hass)
+    return userinfo
+
+
+async def async_get_vehicles(hass, api_key: str, base_url: str) -> list[dict]:
+    """Vehicles linked to an API key, reused for DISCOVERY_TTL seconds."""
+    entry = _get(hass, api_key, base_url)
+    async with entry.lock:
+        if entry.vehicles is not None and time.monotonic() - entry.vehicles_at < DISCOVERY_TTL:
+            _LOGGER.debug("[Discovery] Vehicle list served from cache")
+            return entry.vehicles
+        vehicles = await entry.client.async_get_vehicles()
+        if vehicles:
+            entry.vehicles, entry.vehicles_at = vehicles, time.monotonic()
+    _evict(hass)
+    return vehicles
+
+
+def cached_vehicles(hass, api_key: str, base_url: str) -> list[dict] | None:
+    """The cached vehicle list if still fresh, without any I/O."""
+    cache = hass.data.get(DOMAIN, {}).get(DISCOVERY, {})
+    entry = cache.get((api_key, base_url.rstrip("/")))
+    if entry is None or entry.vehicles is None or time.monotonic() - entry.vehicles_at >= DISCOVERY_TTL:
+        return None
+    return entry.vehicles
@@ -0,0 +1,65 @@
+# custom_components/evlinkha/helpers/fields.py
+
+from typing import Any, Iterable
+
+from ..model import StateNode
+
+# Containers a field path can descend into
+_NODES = (dict, StateNode)
+
+
+class FieldAccessor:
+    """One dotted field path (e.g. "chargeState.batteryLevel"), split once."""
+
+    __slots__ = ("field", "path", "null_value")
+
+    def __init__(self, field: str, null_value: Any = None):
+        self.field = field
+        self.path = tuple(field.split("."))
+        self.null_value = null_value  # returned instead of a missing/None value
+
+    def __call__(self, data) -> Any:
+        val = data
+        for part in self.path:
+            if not isinstance(val, _NODES):
+                return self.null_value
+            val = val.get(part)
+        return self.null_value if val is None else val
+
+
+class FieldTable:
+    """
+    Compiled set of field paths.
+
+    flatten() walks a payload once, following only the branches that lead
+    to a known field, and returns a flat {field: value} table that
+    entities can read in O(1).
+    """
+
+    def __init__(self, fields: Iterable[str], null_values: dict[str, Any] | None = None):
+        null_values = null_values or {}
+        self.accessors = {f: FieldAccessor(f, null_values.get(f)) for f in fields}
+        self.defaults = {f: acc.null_value for f, acc in self.accessors.items()}
+        # key -> [field name if a field ends here, subtree]
+        self._tree: dict[str, list] = {}
+        for acc in self.accessors.values():
+            node = self._tree
+            for part in acc.path[:-1]:
+                node = node.setdefault(part, [None, {}])[1]
+            node.setdefault(acc.path[-1], [None, {}])[0] = acc.field
+
+    def flatten(self, data) -> dict[str, Any]:
+        table = dict(self.defaults)
+        if isinstance(data, _NODES):
+            self._walk(self._tree, data, table)
+        return table
+
+    def _walk(self, tree: dict, node, table: dict) -> None:
+        for key, (field, subtree) in tree.items():
+            val = node.get(key)
+            if val is None:
+                continue
+            if field is not None:
+                table[field] = val
+            if subtree and isinstance(val, _NODES):
+                self._walk(subtree, val, table)
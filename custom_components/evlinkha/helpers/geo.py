@@ -0,0 +1,60 @@
+# custom_components/evlinkha/helpers/geo.py
+
+import math
+import time
+
+from homeassistant.components import zone
+from homeassistant.const import STATE_HOME, STATE_NOT_HOME
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class ZoneResolver:
+    """
+    Device tracker state (home / zone name / not_home) for a position,
+    cached per grid cell of `cell_deg` degrees for `ttl` seconds.
+
+    A parked car resolves its zone once; positions near a zone border
+    share the answer of their cell, which is accurate to the cell size.
+    """
+
+    def __init__(self, hass, cell_deg: float, ttl: float, max_cells: int = 256):
+        self.hass = hass
+        self.cell_deg = cell_deg
+        self.ttl = ttl
+        self.max_cells = max_cells
+        self._cache: dict[tuple[int, int], tuple[float, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, latitude: float, longitude: float, accuracy: int = 0) -> str:
+        cell = (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+        now = time.monotonic()
+        cached = self._cache.get(cell)
+        if cached is not None and now - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        zone_state = zone.async_active_zone(self.hass, latitude, longitude, accuracy)
+        if zone_state is None:
+            state = STATE_NOT_HOME
+        elif zone_state.entity_id == zone.ENTITY_ID_HOME:
+            state = STATE_HOME
+        else:
+            state = zone_state.name
+        if len(self._cache) >= self.max_cells:
+            # Cells passed while driving: drop expired ones, or start over
+            self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.ttl}
+            if len(self._cache) >= self.max_cells:
+                self._cache.clear()
+        self._cache[cell] = (now, state)
+        return state
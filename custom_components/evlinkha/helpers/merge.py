@@ -0,0 +1,86 @@
+# custom_components/evlinkha/helpers/merge.py
+
+from typing import Any
+
+# A push value of {"$delete": true} removes the key; a JSON null sets it to None.
+DELETE_KEY = "$delete"
+
+_MISSING = object()
+
+
+def is_delete(value: Any) -> bool:
+    return isinstance(value, dict) and value.get(DELETE_KEY) is True and len(value) == 1
+
+
+def deep_merge(old: dict | None, patch: dict) -> tuple[dict, set[str]]:
+    """
+    Apply a partial update to a nested state dict.
+
+    Returns (merged, changes) where `changes` holds the dotted paths whose
+    value changed. Subtrees the patch does not touch are shared with `old`
+    rather than copied, and `old` itself is returned when nothing changed,
+    so the cost follows the size of the patch, not the size of the state.
+    `old` is never mutated.
+    """
+    changes: set[str] = set()
+    merged = _merge(old if isinstance(old, dict) else {}, patch, "", changes)
+    return merged, changes
+
+
+def _merge(old: dict, patch: dict, prefix: str, changes: set[str]) -> dict:
+    result = None  # copy-on-write: only copy this level if something changes
+    for key, val in patch.items():
+        path = f"{prefix}{key}"
+        cur = old.get(key, _MISSING)
+
+        if is_delete(val):
+            if cur is _MISSING:
+                continue
+            if result is None:
+                result = dict(old)
+            del result[key]
+            changes.add(path)
+            continue
+
+        if isinstance(val, dict):
+            if not isinstance(cur, dict):
+                changes.add(path)
+                cur_tree = {}
+            else:
+                cur_tree = cur
+            new = _merge(cur_tree, val, path + ".", changes)
+            if new is cur:
+                continue
+        else:
+            if cur is not _MISSING and type(cur) is type(val) and cur == val:
+                continue
+            new = val
+            changes.add(path)
+
+        if result is None:
+            result = dict(old)
+        result[key] = new
+    return old if result is None else result
+
+
+def fold_patches(older: dict, newer: dict) -> dict | None:
+    """
+    Combine two queued pushes into one: applying the result has the same
+    effect as applying `older`, then `newer` ({"$delete": true} markers are
+    kept, unlike deep_merge). Neither input is mutated.
+
+    Returns None when no single patch does that: `older` replaces a key by
+    a non-object (or deletes it) and `newer` patches it as an object,
+    which would otherwise merge into the state's old value.
+    """
+    result = dict(older)
+    for key, val in newer.items():
+        if isinstance(val, dict) and not is_delete(val) and key in result:
+            cur = result[key]
+            if not isinstance(cur, dict) or is_delete(cur):
+                return None
+            val = fold_patches(cur, val)
+            if val is None:
+                return None
+        result[key] = val
+    return result
@@ -1,14 +1,13 @@
 import logging
-from .api import EVLinkHAClient
+from ..api import EVLinkHAClient
+from .discovery import async_get_userinfo, cached_vehicles
 
 _LOGGER = logging.getLogger(__name__)
 
 async def validate_api_key(hass, api_key: str, base_url: str = "https://api.evlinkha.se") -> bool:
     """Validate API-key against EVLinkHA backend. Returns True/False."""
     try:
-        client = EVLinkHAClient(hass, api_key, base_url, "dummy")
-        _LOGGER.debug("[Validator] Created EVLinkHAClient for API key validation")
-        userinfo = await client.async_get_userinfo()
+        userinfo = await async_get_userinfo(hass, api_key, base_url)
         _LOGGER.debug(f"[Validator] Result from async_get_userinfo: {userinfo}")
         return bool(userinfo)
     except Exception as e:
@@ -17,6 +16,11 @@ async def validate_api_key(hass, api_key: str, base_url: str = "https://api.evli
 
 async def validate_vehicle_id(hass, api_key: str, vehicle_id: str, base_url: str = "https://api.evlinkha.se") -> bool:
     """Validate vehicle_id by trying to fetch status. Returns True/False."""
+    # A fresh vehicle list from discovery answers without a request
+    vehicles = cached_vehicles(hass, api_key, base_url)
+    if vehicles is not None and any(v.get("vehicleId") == vehicle_id for v in vehicles):
+        _LOGGER.debug(f"[Validator] Vehicle id {vehicle_id} found in discovery cache")
+        return True
     try:
         client = EVLinkHAClient(hass, api_key, base_url, vehicle_id)
         data = await client.async_get_vehicle_status()
@@ -0,0 +1,344 @@
+# custom_components/evlinkha/model.py
+
+import sys
+from operator import attrgetter
+
+from .const import STATIC_STATUS_KEYS
+from .helpers.merge import deep_merge, is_delete
+
+
+class StateNode:
+    """
+    Parsed block of a vehicle status payload.
+
+    Known keys live in `__slots__` attributes (snake_case), so a vehicle
+    costs a few small fixed-size objects instead of a tree of dicts, and
+    hot paths read plain attributes. String values of enum-like keys are
+    interned: every vehicle shares one "PLUGGED_IN:CHARGING" object.
+
+    Keys the model does not know are kept in `extra` as they came, so
+    nothing is lost. The node also reads like the dict it was built from
+    (get, [], in, keys, items), with a known key set to null reading as
+    missing, and as_dict() gives the JSON back.
+
+    Nodes are never mutated after parsing: merge() returns a new node
+    that shares every untouched block with the old one.
+    """
+
+    __slots__ = ("extra",)
+
+    _keys: dict[str, str] = {}                    # JSON key -> slot
+    _enums: frozenset[str] = frozenset()          # JSON keys whose strings are interned
+    _children: dict[str, type["StateNode"]] = {}  # JSON key -> node class of that block
+    _slot_names: tuple[str, ...] = ("extra",)
+    _slot_values = attrgetter("extra")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._slot_names = (*cls._keys.values(), "extra")
+        cls._slot_values = attrgetter(*cls._slot_names)
+
+    def __init__(self):
+        for slot in self._slot_names:
+            setattr(self, slot, None)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StateNode":
+        node = cls()
+        extra = None
+        for key, value in data.items():
+            slot = cls._keys.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                setattr(node, slot, cls._parse(key, value))
+        node.extra = extra
+        return node
+
+    @classmethod
+    def _parse(cls, key: str, value):
+        child = cls._children.get(key)
+        if child is not None and isinstance(value, dict):
+            return child.from_dict(value)
+        if key in cls._enums and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def _copy(self) -> "StateNode":
+        node = self.__class__.__new__(self.__class__)
+        for slot, value in zip(self._slot_names, self._slot_values(self)):
+            setattr(node, slot, value)
+        return node
+
+    # Dict-style access, for generic field paths and unknown keys
+
+    def get(self, key: str, default=None):
+        slot = self._keys.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+        elif self.extra is not None:
+            value = self.extra.get(key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        slot = self._keys.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is not None:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        slot = self._keys.get(key)
+        if slot is not None:
+            return getattr(self, slot) is not None
+        return self.extra is not None and key in self.extra
+
+    def keys(self):
+        known = [key for key, slot in self._keys.items() if getattr(self, slot) is not None]
+        return known + list(self.extra or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __bool__(self) -> bool:
+        # Without building keys(): `state or EMPTY_STATE` is on hot paths
+        for slot in self._slot_names:
+            if getattr(self, slot) is not None:
+                return True
+        return False
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self._slot_names)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.as_dict()!r})"
+
+    def as_dict(self) -> dict:
+        """The block as JSON-ready dicts (known keys set to null are left out)."""
+        out = {}
+        for key, slot in self._keys.items():
+            value = getattr(self, slot)
+            if value is not None:
+                out[key] = value.as_dict() if isinstance(value, StateNode) else value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    # Partial updates
+
+    def merge(self, patch: dict) -> tuple["StateNode", set[str]]:
+        """
+        Apply a partial update, like helpers.merge.deep_merge: returns
+        (merged, changed dotted paths), `self` when nothing changed, and
+        shares untouched blocks with `self`.
+        """
+        changes: set[str] = set()
+        return self._merge(patch, "", changes), changes
+
+    def _merge(self, patch: dict, prefix: str, changes: set[str]) -> "StateNode":
+        result = None  # copy-on-write
+        extra_patch = None
+        for key, value in patch.items():
+            slot = self._keys.get(key)
+            if slot is None:
+                if extra_patch is None:
+                    extra_patch = {}
+                extra_patch[key] = value
+                continue
+
+            path = f"{prefix}{key}"
+            cur = getattr(self, slot)
+            if value is None or is_delete(value):
+                if cur is None:
+                    continue
+                new = None
+                changes.add(path)
+            elif isinstance(value, dict):
+                child = self._children.get(key)
+                if child is not None:
+                    base = cur if isinstance(cur, child) else child()
+                    if base is not cur:
+                        changes.add(path)
+                    new = base._merge(value, path + ".", changes)
+                else:
+                    new, sub = deep_merge(cur, value)
+                    if not isinstance(cur, dict):
+                        changes.add(path)
+                    changes.update(f"{path}.{p}" for p in sub)
+                if new is cur:
+                    continue
+            else:
+                if type(cur) is type(value) and cur == value:
+                    continue
+                new = self._parse(key, value)
+                changes.add(path)
+
+            if result is None:
+                result = self._copy()
+            setattr(result, slot, new)
+
+        if extra_patch:
+            extra, sub = deep_merge(self.extra or {}, extra_patch)
+            if sub:
+                if result is None:
+                    result = self._copy()
+                result.extra = extra or None
+                changes.update(f"{prefix}{p}" for p in sub)
+        return self if result is None else result
+
+
+class ChargeState(StateNode):
+    __slots__ = (
+        "battery_level", "battery_capacity", "charge_limit", "power_delivery_state",
+        "charge_rate", "charge_time_remaining", "is_plugged_in", "is_charging", "range",
+    )
+    _keys = {
+        "batteryLevel": "battery_level",
+        "batteryCapacity": "battery_capacity",
+        "chargeLimit": "charge_limit",
+        "powerDeliveryState": "power_delivery_state",
+        "chargeRate": "charge_rate",
+        "chargeTimeRemaining": "charge_time_remaining",
+        "isPluggedIn": "is_plugged_in",
+        "isCharging": "is_charging",
+        "range": "range",
+    }
+    _enums = frozenset({"powerDeliveryState"})
+
+
+class Location(StateNode):
+    __slots__ = ("latitude", "longitude")
+    _keys = {"latitude": "latitude", "longitude": "longitude"}
+
+
+class Information(StateNode):
+    __slots__ = ("display_name", "vin", "brand", "model", "year")
+    _keys = {
+        "displayName": "display_name",
+        "vin": "vin",
+        "brand": "brand",
+        "model": "model",
+        "year": "year",
+    }
+    _enums = frozenset({"brand", "model"})
+
+
+class Odometer(StateNode):
+    __slots__ = ("distance",)
+    _keys = {"distance": "distance"}
+
+
+class SmartChargingPolicy(StateNode):
+    __slots__ = ("is_enabled", "minimum_charge_limit", "deadline")
+    _keys = {
+        "isEnabled": "is_enabled",
+        "minimumChargeLimit": "minimum_charge_limit",
+        "deadline": "deadline",
+    }
+
+
+class Capability(StateNode):
+    __slots__ = ("is_capable", "intervention_ids")
+    _keys = {"isCapable": "is_capable", "interventionIds": "intervention_ids"}
+
+
+class Capabilities(StateNode):
+    __slots__ = (
+        "charge_state", "information", "location", "odometer", "smart_charging_policy",
+        "smart_charging", "start_charging", "stop_charging", "set_max_current",
+    )
+    _keys = {
+        "chargeState": "charge_state",
+        "information": "information",
+        "location": "location",
+        "odometer": "odometer",
+        "smartChargingPolicy": "smart_charging_policy",
+        "smartCharging": "smart_charging",
+        "startCharging": "start_charging",
+        "stopCharging": "stop_charging",
+        "setMaxCurrent": "set_max_current",
+    }
+    _children = dict.fromkeys(_keys, Capability)
+
+
+class VehicleState(StateNode):
+    """One vehicle's /status payload."""
+
+    __slots__ = (
+        "vehicle_id", "vehicle_name", "charging_state", "last_seen", "is_reachable", "vendor",
+        "charge_state", "location", "information", "odometer", "smart_charging_policy",
+        "capabilities",
+    )
+    _keys = {
+        "vehicleId": "vehicle_id",
+        "vehicleName": "vehicle_name",
+        "chargingState": "charging_state",
+        "lastSeen": "last_seen",
+        "isReachable": "is_reachable",
+        "vendor": "vendor",
+        "chargeState": "charge_state",
+        "location": "location",
+        "information": "information",
+        "odometer": "odometer",
+        "smartChargingPolicy": "smart_charging_policy",
+        "capabilities": "capabilities",
+    }
+    _enums = frozenset({"chargingState", "vendor"})
+    _children = {
+        "chargeState": ChargeState,
+        "location": Location,
+        "information": Information,
+        "odometer": Odometer,
+        "smartChargingPolicy": SmartChargingPolicy,
+        "capabilities": Capabilities,
+    }
+
+    @property
+    def is_charging(self) -> bool:
+        return self.charge_state is not None and bool(self.charge_state.is_charging)
+
+    @property
+    def is_plugged_in(self) -> bool:
+        return self.charge_state is not None and bool(self.charge_state.is_plugged_in)
+
+
+# Status of a vehicle nothing is known about yet (never mutated)
+EMPTY_STATE = VehicleState()
+
+
+def parse_status(data, static: VehicleState | None = None):
+    """
+    Status payload as a VehicleState (anything but a JSON object is returned as is).
+
+    The STATIC_STATUS_KEYS blocks `static` has are taken over from it as
+    they are, instead of being parsed again.
+    """
+    if not isinstance(data, dict):
+        return data
+    if static is None:
+        return VehicleState.from_dict(data)
+    reused = {
+        key: block for key in STATIC_STATUS_KEYS
+        if key in data and (block := static.get(key)) is not None
+    }
+    state = VehicleState.from_dict({k: v for k, v in data.items() if k not in reused})
+    for key, block in reused.items():
+        setattr(state, VehicleState._keys[key], block)
+    return state
@@ -0,0 +1,128 @@
+# custom_components/evlinkha/push.py
+
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_PUSH_COALESCE_WINDOW, PUSH_MAX_PENDING
+from .helpers.merge import fold_patches
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PushCoalescer:
+    """
+    Collects webhook pushes and applies them to the vehicle coordinator
+    in batches.
+
+    The first push after a flush opens a window of `window` seconds.
+    Every push received in that window is queued per vehicle, and the
+    whole batch is applied as one coordinator update when the window
+    closes. The window is not extended by later pushes, so a sustained
+    burst still flushes at least once per window (with a window of 0,
+    right after the current handler). The queue is bounded: reaching
+    `max_pending` pushes flushes early.
+
+    While paused (entry setup still running) pushes are only buffered;
+    once the buffer is full a push is folded into the last one queued for
+    its vehicle (helpers.merge.fold_patches), so nothing is lost. Pushes
+    that cannot be folded (a vehicle's first, or one that re-creates a
+    key the queued push deletes) are still queued beyond `max_pending`.
+    """
+
+    def __init__(self, hass, coordinator, window: float = DEFAULT_PUSH_COALESCE_WINDOW,
+                 max_pending: int = PUSH_MAX_PENDING, paused: bool = False):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.window = window
+        self.max_pending = max_pending
+        self.paused = paused
+        self._pending: dict[str, list[dict]] = {}
+        self._pending_count = 0
+        self._unsub_timer = None
+        self.stats = {
+            "received": 0,      # pushes accepted by the webhook
+            "coalesced": 0,     # pushes folded into a batch with others
+            "flushes": 0,       # batches applied to the coordinator
+            "applied": 0,       # batches that changed data (listeners notified)
+            "forced_flushes": 0,  # early flushes because the queue was full
+            "folded": 0,        # pushes folded into a queued one while paused with a full buffer
+        }
+
+    @callback
+    def async_submit(self, vehicle_id: str, patch: dict) -> None:
+        """Queue one push; returns immediately."""
+        self.stats["received"] += 1
+        queue = self._pending.get(vehicle_id)
+        if self.paused and queue and self._pending_count >= self.max_pending:
+            folded = fold_patches(queue[-1], patch)
+            if folded is not None:
+                queue[-1] = folded
+                self.stats["folded"] += 1
+                return
+        if queue is None:
+            queue = self._pending[vehicle_id] = []
+        queue.append(patch)
+        self._pending_count += 1
+
+        if self.paused:
+            return
+        if self._pending_count >= self.max_pending:
+            self.stats["forced_flushes"] += 1
+            self.async_flush()
+        elif self._unsub_timer is None:
+            # A window of 0 still defers the flush to the next loop iteration,
+            # so the webhook answers before the coordinator update runs
+            self._unsub_timer = async_call_later(self.hass, max(self.window, 0), self._async_window_closed)
+
+    @callback
+    def _async_window_closed(self, _now) -> None:
+        self._unsub_timer = None
+        self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Apply everything queued so far as one coordinator update."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._pending:
+            return
+        pending, count = self._pending, self._pending_count
+        self._pending, self._pending_count = {}, 0
+
+        self.stats["flushes"] += 1
+        self.stats["coalesced"] += count - 1
+        start = time.perf_counter()
+        try:
+            changes = self.coordinator.async_apply_pushes(pending)
+        except Exception:
+            _LOGGER.exception("Error applying %d coalesced push(es)", count)
+            return
+        self.coordinator.client.metrics.record_push_apply(time.perf_counter() - start)
+        if any(changes.values()):
+            self.stats["applied"] += 1
+        _LOGGER.debug("Applied %d push(es) for %d vehicle(s) as one update", count, len(pending))
+
+    @callback
+    def async_set_window(self, window: float) -> None:
+        """Change the coalescing window; a window already open keeps its timer."""
+        self.window = window
+        if window <= 0:
+            self.async_flush()
+
+    @callback
+    def async_resume(self) -> None:
+        """Start applying pushes; anything buffered meanwhile is applied now."""
+        self.paused = False
+        self.async_flush()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop pending pushes and cancel the window timer (entry unload)."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._pending, self._pending_count = {}, 0
@@ -1,9 +1,19 @@
 # custom_components/evlinkha/sensor.py
 
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.components.sensor import SensorEntity
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN, ICONS, USER_FIELDS, VEHICLE_FIELDS, WEBHOOK_FIELDS
+from .const import DOMAIN, ICONS, METRIC_FIELDS, METRICS_UPDATE_INTERVAL, USER_FIELDS, VEHICLE_FIELDS, WEBHOOK_FIELDS, ANALYTICS_FIELDS
+from .analytics import ANALYTICS_SOURCE_FIELDS
+from .coordinator import is_static_field
+from .model import Capabilities
+from .entity import (
+    EVLinkHAVehicleEntity, hub_device_info, vehicle_name_prefix, vehicle_unique_prefix,
+)
 import logging
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,56 +21,125 @@ async def async_setup_entry(hass, entry, async_add_entities):
     """Set up EVLinkHA sensors."""
     user_coordinator = hass.data[DOMAIN].get(entry.entry_id)
     vehicle_coordinator = hass.data[DOMAIN].get(f"{entry.entry_id}_vehicle")
+    analytics = hass.data[DOMAIN].get(f"{entry.entry_id}_analytics")
 
     entities = []
 
-    # Hämta capabilities från senaste vehicle-status
-    vehicle_data = vehicle_coordinator.data or {}
-    capabilities = vehicle_data.get("capabilities", {})
-    _LOGGER.debug("[EVLinkHA] Vehicle capabilities: %s", capabilities)
-
-    def is_field_capable(field):
-        cap_key = field.split(".")[0]
-        cap = capabilities.get(cap_key, {})
-        is_cap = cap.get("isCapable", True)  # Default True för bakåtkompabilitet
-        _LOGGER.debug("[EVLinkHA] Field '%s' capability '%s': %s", field, cap_key, is_cap)
-        return is_cap
-
     # Userinfo sensors
     for field, (label, unit) in USER_FIELDS.items():
         entities.append(EVLinkHASensor(user_coordinator, entry, field, label, unit))
 
-    # Vehicle status sensors, nu med filtrering!
+    # Vehicle status sensors, one set per vehicle, filtered by capabilities.
+    # The reconciler keeps the set current when capabilities change later.
     if vehicle_coordinator:
-        for field, (label, unit) in VEHICLE_FIELDS.items():
-            if is_field_capable(field):
-                entities.append(
-                    EVLinkHAVehicleSensor(vehicle_coordinator, entry, field, label, unit)
-                )
-                _LOGGER.warning(
-                    "[EVLinkHA] Sensor created: %s, field: %s",
-                    f"{DOMAIN}-{entry.entry_id}-vehicle-{field}",
-                    field,
-                )
-            else:
-                _LOGGER.warning(
-                    "[EVLinkHA] Skipping sensor for field '%s' since capability '%s' isCapable: False",
-                    field, field.split(".")[0]
+        reconciler = EVLinkHASensorReconciler(hass, vehicle_coordinator, entry, async_add_entities)
+        entities.extend(reconciler.async_initial_entities())
+        entry.async_on_unload(vehicle_coordinator.async_add_listener(reconciler.async_reconcile))
+
+        for vehicle_id in vehicle_coordinator.vehicle_ids:
+            entities.append(
+                EVLinkHALocation(
+                    vehicle_coordinator,  # based on the status coordinator
+                    entry,
+                    vehicle_id,
                 )
+            )
 
-    entities.append(
-        EVLinkHALocation(
-            vehicle_coordinator,  # based on the status coordinator
-            entry
-        )
-    )
+            # Derived charging analytics, computed incrementally per update
+            if analytics is not None:
+                for field, (label, unit) in ANALYTICS_FIELDS.items():
+                    entities.append(EVLinkHAAnalyticsSensor(
+                        vehicle_coordinator, entry, vehicle_id, analytics, field, label, unit
+                    ))
 
     for field, (label, unit) in WEBHOOK_FIELDS.items():
         entities.append(EVLinkHAWebhookIdSensor(user_coordinator, entry, field, label, unit))
 
+    # Diagnostic sensors for API/webhook instrumentation
+    if vehicle_coordinator:
+        for field, (label, unit) in METRIC_FIELDS.items():
+            entities.append(EVLinkHAMetricSensor(vehicle_coordinator, entry, field, label, unit))
+
     async_add_entities(entities)
 
 
+def is_field_capable(capabilities, field):
+    cap_key = field.split(".")[0]
+    cap = capabilities.get(cap_key) or {}
+    return cap.get("isCapable", True)  # Default True för bakåtkompabilitet
+
+
+class EVLinkHASensorReconciler:
+    """
+    Keeps the capability-filtered vehicle sensors in line with the data.
+
+    Runs on every vehicle coordinator update. The capabilities of a
+    vehicle are only re-evaluated when its capabilities object changed,
+    and a change adds the newly capable sensors and removes the ones
+    that lost their capability, without reloading the entry. Only the
+    entity objects are removed: their registry entries (name, area,
+    disabled flag) stay, so a sensor whose capability comes back returns
+    unchanged, and a capability flap costs no customisations.
+    """
+
+    def __init__(self, hass, coordinator, entry, async_add_entities):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry = entry
+        self._async_add_entities = async_add_entities
+        self._sensors: dict[str, dict[str, EVLinkHAVehicleSensor]] = {}
+        self._capabilities: dict[str, Capabilities | None] = {}
+
+    @staticmethod
+    def _wanted(capabilities) -> list[str]:
+        capabilities = capabilities or {}
+        return [field for field in VEHICLE_FIELDS if is_field_capable(capabilities, field)]
+
+    def _create(self, vehicle_id: str, field: str) -> "EVLinkHAVehicleSensor":
+        label, unit = VEHICLE_FIELDS[field]
+        sensor = EVLinkHAVehicleSensor(self.coordinator, self.entry, vehicle_id, field, label, unit)
+        self._sensors.setdefault(vehicle_id, {})[field] = sensor
+        return sensor
+
+    @callback
+    def async_initial_entities(self) -> list:
+        entities = []
+        for vehicle_id in self.coordinator.vehicle_ids:
+            capabilities = self.coordinator.vehicle_data(vehicle_id).capabilities
+            self._capabilities[vehicle_id] = capabilities
+            self._sensors[vehicle_id] = {}
+            for field in self._wanted(capabilities):
+                entities.append(self._create(vehicle_id, field))
+            _LOGGER.debug("[EVLinkHA] Vehicle %s: %d capable sensors", vehicle_id, len(self._sensors[vehicle_id]))
+        return entities
+
+    @callback
+    def async_reconcile(self) -> None:
+        added = []
+        for vehicle_id in self.coordinator.vehicle_ids:
+            capabilities = self.coordinator.vehicle_data(vehicle_id).capabilities
+            previous = self._capabilities.get(vehicle_id)
+            # Merged pushes share the unchanged capabilities object
+            if capabilities is previous or capabilities == previous:
+                continue
+            self._capabilities[vehicle_id] = capabilities
+
+            current = self._sensors.setdefault(vehicle_id, {})
+            wanted = self._wanted(capabilities)
+            for field in wanted:
+                if field not in current:
+                    added.append(self._create(vehicle_id, field))
+            for field in current.keys() - set(wanted):
+                sensor = current.pop(field)
+                # A disabled sensor was never added and has nothing to remove
+                if sensor.hass is not None:
+                    self.hass.async_create_task(sensor.async_remove())
+                _LOGGER.info("[EVLinkHA] Removed sensor %s: capability no longer available", sensor.unique_id)
+        if added:
+            _LOGGER.info("[EVLinkHA] Adding %d sensor(s) for new capabilities", len(added))
+            self._async_add_entities(added)
+
+
 class EVLinkHASensor(CoordinatorEntity, SensorEntity):
     """Sensor for user information."""
 
@@ -73,12 +152,7 @@ class EVLinkHASensor(CoordinatorEntity, SensorEntity):
 
     @property
     def device_info(self) -> DeviceInfo:
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": "EVLinkHA",
-            "manufacturer": "Roger Aspelin",
-            "model": "EVLinkHA Integration",
-        }
+        return hub_device_info(self._entry)
 
     @property
     def name(self):
@@ -102,47 +176,32 @@ class EVLinkHASensor(CoordinatorEntity, SensorEntity):
         # Fallback to entry_id if data is missing
         return f"{DOMAIN}-{self._entry.entry_id}-{self._field}"
 
-class EVLinkHAVehicleSensor(CoordinatorEntity, SensorEntity):
+class EVLinkHAVehicleSensor(EVLinkHAVehicleEntity, SensorEntity):
     """Sensor for vehicle status."""
 
-    def __init__(self, coordinator, entry, field, name, unit):
-        super().__init__(coordinator)
-        self._entry = entry
+    def __init__(self, coordinator, entry, vehicle_id, field, name, unit):
+        super().__init__(coordinator, entry, vehicle_id)
         self._field = field
         self._name = name
         self._unit = unit
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": "EVLinkHA",
-            "manufacturer": "Roger Aspelin",
-            "model": "EVLinkHA Integration",
-        }
+        self._watched_fields = (field,)
+        # Static-tier fields (information.*, vendor) read the slow table
+        self._table = (
+            coordinator.static_fields if is_static_field(field) else coordinator.vehicle_fields
+        )
+        # Superseded by the device tracker, which filters GPS jitter
+        if field in ("location.latitude", "location.longitude"):
+            self._attr_entity_registry_enabled_default = False
 
     @property
     def name(self):
-        return f"EVLinkHA {self._name}"
+        return f"{vehicle_name_prefix(self.coordinator, self._vehicle_id)} {self._name}"
 
     @property
     def state(self):
-        # Retrieve the value from the nested JSON
-        data = self.coordinator.data or {}
-        parts = self._field.split(".")
-        val = data
-        for p in parts:
-            if not isinstance(val, dict):
-                val = None
-                break
-            val = val.get(p)
-
-        # Special handling for null values on chargeRate and chargeTimeRemaining
-        if self._field in ("chargeState.chargeRate", "chargeState.chargeTimeRemaining"):
-            return "--" if val is None else val
-
-        # Other sensors: return as usual (None → Unknown)
-        return val
+        # Flattened once per coordinator update; null handling (e.g. "--" for
+        # chargeRate/chargeTimeRemaining) is compiled into the field table
+        return self._table(self._vehicle_id)[self._field]
 
     @property
     def unit_of_measurement(self):
@@ -155,48 +214,73 @@ class EVLinkHAVehicleSensor(CoordinatorEntity, SensorEntity):
     @property
     def unique_id(self):
         # Consistent id independent of response data
-        return f"{DOMAIN}-{self._entry.entry_id}-vehicle-{self._field}"
+        prefix = vehicle_unique_prefix(self.coordinator, self._entry, self._vehicle_id)
+        return f"{prefix}-vehicle-{self._field}"
 
-class EVLinkHALocation(CoordinatorEntity, SensorEntity):
+class EVLinkHALocation(EVLinkHAVehicleEntity, SensorEntity):
     """Template sensor for vehicle position with lat/lon attributes."""
 
-    def __init__(self, coordinator, entry):
-        super().__init__(coordinator)
-        self._entry = entry
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": "EVLinkHA",
-            "manufacturer": "Roger Aspelin",
-            "model": "EVLinkHA Integration",
-        }
+    _watched_fields = ("vehicleName", "location.latitude", "location.longitude")
+    # Superseded by the device tracker; existing registrations keep their state
+    _attr_entity_registry_enabled_default = False
 
     @property
     def name(self) -> str:
-        return "EVLinkHA Location"
+        return f"{vehicle_name_prefix(self.coordinator, self._vehicle_id)} Location"
 
     @property
     def state(self) -> str:
         """Use vehicleName as the state (or any field)."""
-        data = self.coordinator.data or {}
         # vehicleName comes from /status/:vehicle_id
-        return data.get("vehicleName") or "Unknown"
+        return self.coordinator.vehicle_data(self._vehicle_id).vehicle_name or "Unknown"
 
     @property
     def extra_state_attributes(self) -> dict:
         """Expose latitude/longitude as attributes."""
-        data = self.coordinator.data or {}
-        loc = data.get("location", {})
+        loc = self.coordinator.vehicle_data(self._vehicle_id).location
         return {
-            "latitude":  loc.get("latitude"),
-            "longitude": loc.get("longitude"),
+            "latitude":  loc.latitude if loc else None,
+            "longitude": loc.longitude if loc else None,
         }
 
     @property
     def unique_id(self) -> str:
-        return f"{DOMAIN}-{self._entry.entry_id}-location"
+        prefix = vehicle_unique_prefix(self.coordinator, self._entry, self._vehicle_id)
+        return f"{prefix}-location"
+
+class EVLinkHAAnalyticsSensor(EVLinkHAVehicleEntity, SensorEntity):
+    """Derived charging value (session energy, average rate, ETA, efficiency)."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _watched_fields = ANALYTICS_SOURCE_FIELDS
+
+    def __init__(self, coordinator, entry, vehicle_id, analytics, field, name, unit):
+        super().__init__(coordinator, entry, vehicle_id)
+        self._analytics = analytics
+        self._field = field
+        self._name = name
+        self._unit = unit
+
+    @property
+    def name(self):
+        return f"{vehicle_name_prefix(self.coordinator, self._vehicle_id)} {self._name}"
+
+    @property
+    def state(self):
+        return self._analytics.get(self._vehicle_id).get(self._field)
+
+    @property
+    def unit_of_measurement(self):
+        return self._unit
+
+    @property
+    def icon(self):
+        return ICONS.get(self._field)
+
+    @property
+    def unique_id(self):
+        prefix = vehicle_unique_prefix(self.coordinator, self._entry, self._vehicle_id)
+        return f"{prefix}-analytics-{self._field}"
 
 class EVLinkHAWebhookIdSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, coordinator, entry, field, name, unit):
@@ -208,12 +292,7 @@ class EVLinkHAWebhookIdSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def device_info(self) -> DeviceInfo:
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": "EVLinkHA",
-            "manufacturer": "Roger Aspelin",
-            "model": "EVLinkHA Integration",
-        }
+        return hub_device_info(self._entry)
 
     @property
     def name(self):
@@ -236,3 +315,77 @@ class EVLinkHAWebhookIdSensor(CoordinatorEntity, SensorEntity):
     def unique_id(self):
         # Fallback to entry_id if data is missing
         return f"{DOMAIN}-{self._entry.entry_id}-{self._field}"
+
+class EVLinkHAMetricSensor(SensorEntity):
+    """
+    Diagnostic sensor for client request and push metrics.
+
+    Not a CoordinatorEntity: the vehicle coordinator only notifies when
+    vehicle data changes, so 304s, deferred and unchanged polls would
+    freeze the counters. The sensor re-reads the metrics every
+    METRICS_UPDATE_INTERVAL and writes only when they changed.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, coordinator, entry, field, name, unit):
+        self.coordinator = coordinator
+        self._entry = entry
+        self._field = field
+        self._name = name
+        self._unit = unit
+        self._written = None
+        # Counters only grow; latencies are point-in-time values
+        self._attr_state_class = (
+            SensorStateClass.MEASUREMENT if unit == "ms" else SensorStateClass.TOTAL_INCREASING
+        )
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(async_track_time_interval(
+            self.hass, self._async_tick, timedelta(seconds=METRICS_UPDATE_INTERVAL)
+        ))
+
+    @callback
+    def _async_tick(self, _now) -> None:
+        current = (self.state, self.extra_state_attributes)
+        if current != self._written:
+            self._written = current
+            self.async_write_ha_state()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return hub_device_info(self._entry)
+
+    @property
+    def name(self):
+        return f"EVLinkHA {self._name}"
+
+    @property
+    def state(self):
+        return self.coordinator.client.metrics.summary().get(self._field)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Per-endpoint breakdown for the request sensors."""
+        if self._field not in ("requests", "latency_p95", "errors", "rate_limited"):
+            return {}
+        endpoints = self.coordinator.client.metrics.as_dict()["endpoints"]
+        if self._field == "latency_p95":
+            return {name: stats["latency_ms"] for name, stats in endpoints.items()}
+        if self._field == "requests":
+            return {name: stats["requests"] for name, stats in endpoints.items()}
+        return {name: stats["statuses"] for name, stats in endpoints.items()}
+
+    @property
+    def unit_of_measurement(self):
+        return self._unit
+
+    @property
+    def icon(self):
+        return ICONS.get(self._field)
+
+    @property
+    def unique_id(self):
+        return f"{DOMAIN}-{self._entry.entry_id}-metrics-{self._field}"
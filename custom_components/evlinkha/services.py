@@ -0,0 +1,207 @@
+# custom_components/evlinkha/services.py
+
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .api import EVLinkHARateLimited
+from .const import DOMAIN, CONF_VEHICLE_ID, CHARGING_FANOUT_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+CHARGING_INDEX = "charging_index"
+ATTR_ALL = "all"
+
+SET_CHARGING_SCHEMA = vol.Schema({
+    vol.Required("action"): vol.All(vol.Upper, vol.In(["START", "STOP"])),
+    vol.Optional(CONF_VEHICLE_ID): vol.All(cv.ensure_list, [str]),
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+    vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    vol.Optional(ATTR_ALL, default=False): cv.boolean,
+})
+
+TELEMETRY_SCHEMA = vol.Schema({
+    vol.Optional(CONF_VEHICLE_ID): str,
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("bucket"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+})
+
+
+def _index(hass) -> dict:
+    return hass.data.setdefault(DOMAIN, {}).setdefault(
+        CHARGING_INDEX, {"vehicles": {}, "devices": {}}
+    )
+
+
+@callback
+def async_index_entry(hass, entry_id: str, commands, vehicle_ids: list[str], fleet: bool):
+    """
+    Make an entry's vehicles reachable for set_charging.
+
+    Vehicles map to the entry's command pipeline; device identifiers map
+    to the vehicles behind them (the hub device to all of the entry's
+    vehicles). Returns a callable that removes the entry again.
+    """
+    index = _index(hass)
+    devices = {entry_id: list(vehicle_ids)}
+    if fleet:
+        devices.update({f"{entry_id}-{vid}": [vid] for vid in vehicle_ids})
+    for vid in vehicle_ids:
+        index["vehicles"][vid] = commands
+    index["devices"].update(devices)
+
+    @callback
+    def _unindex() -> None:
+        for vid in vehicle_ids:
+            if index["vehicles"].get(vid) is commands:
+                del index["vehicles"][vid]
+        for ident in devices:
+            index["devices"].pop(ident, None)
+
+    return _unindex
+
+
+def _resolve_targets(hass, data: dict) -> list[str]:
+    """Vehicle ids addressed by a set_charging call, in a stable order."""
+    index = _index(hass)
+    vehicles = index["vehicles"]
+    if data[ATTR_ALL]:
+        return list(vehicles)
+
+    targets: dict[str, None] = {}
+    for vid in data.get(CONF_VEHICLE_ID, []):
+        if vid not in vehicles:
+            raise ServiceValidationError(f"Unknown EVLinkHA vehicle: {vid}")
+        targets[vid] = None
+
+    device_ids = list(data.get(ATTR_DEVICE_ID, []))
+    if ATTR_ENTITY_ID in data:
+        ent_reg = er.async_get(hass)
+        for entity_id in data[ATTR_ENTITY_ID]:
+            entity = ent_reg.async_get(entity_id)
+            if entity is None or entity.platform != DOMAIN or entity.device_id is None:
+                raise ServiceValidationError(f"{entity_id} is not an EVLinkHA vehicle entity")
+            device_ids.append(entity.device_id)
+
+    dev_reg = dr.async_get(hass)
+    for device_id in device_ids:
+        device = dev_reg.async_get(device_id)
+        idents = [ident for domain, ident in (device.identifiers if device else ()) if domain == DOMAIN]
+        vids = [vid for ident in idents for vid in index["devices"].get(ident, ())]
+        if not vids:
+            raise ServiceValidationError(f"Device {device_id} is not an EVLinkHA vehicle")
+        targets.update(dict.fromkeys(vids))
+
+    if not targets and len(vehicles) == 1:
+        # Single vehicle installations need no target
+        return list(vehicles)
+    if not targets:
+        raise ServiceValidationError(
+            "set_charging needs a vehicle_id, device_id, entity_id or all: true"
+        )
+    return list(targets)
+
+
+async def _handle_set_charging(hass, call) -> dict:
+    """
+    Send START/STOP to every targeted vehicle at once, at most
+    CHARGING_FANOUT_CONCURRENCY commands in flight, and report per vehicle.
+    """
+    action = call.data["action"]
+    vehicle_ids = _resolve_targets(hass, call.data)
+    pipelines = _index(hass)["vehicles"]
+    semaphore = asyncio.Semaphore(CHARGING_FANOUT_CONCURRENCY)
+    _LOGGER.debug("Service set_charging called with action=%s for %s", action, vehicle_ids)
+
+    async def _send(vid: str):
+        async with semaphore:
+            return await pipelines[vid].async_set_charging(vid, action)
+
+    results = await asyncio.gather(*(_send(vid) for vid in vehicle_ids), return_exceptions=True)
+
+    response = {}
+    for vid, result in zip(vehicle_ids, results):
+        if isinstance(result, EVLinkHARateLimited):
+            _LOGGER.error("Charging %s for %s not sent: %s", action, vid, result)
+            response[vid] = {
+                "success": False, "error": str(result),
+                "rate_limited": True, "retry_after": round(result.retry_after, 1),
+            }
+        elif isinstance(result, BaseException):
+            _LOGGER.error("Charging %s for %s failed: %s", action, vid, result)
+            response[vid] = {"success": False, "error": str(result)}
+        elif result:
+            _LOGGER.info("Charging %s for %s executed successfully", action, vid)
+            response[vid] = {"success": True, "response": result}
+        else:
+            _LOGGER.error("Charging %s for %s failed or returned None", action, vid)
+            response[vid] = {"success": False}
+    return {"vehicles": response}
+
+
+async def _handle_get_telemetry(hass, call) -> dict:
+    """
+    Telemetry history from the in-memory buffers of every loaded entry.
+    Returns raw samples, or per-bucket aggregates when `bucket` (seconds)
+    is given. The recorder database is not touched.
+    """
+    wanted = call.data.get(CONF_VEHICLE_ID)
+    start = call.data.get("start")
+    end = call.data.get("end")
+    start = dt_util.as_utc(start).timestamp() if start else None
+    end = dt_util.as_utc(end).timestamp() if end else None
+    bucket = call.data.get("bucket")
+
+    def _iso(ts: float) -> str:
+        return dt_util.utc_from_timestamp(ts).isoformat()
+
+    vehicles = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        recorder = hass.data.get(DOMAIN, {}).get(f"{entry.entry_id}_telemetry")
+        if recorder is None:
+            continue
+        for vid, buffer in recorder.buffers.items():
+            if wanted and vid != wanted:
+                continue
+            if bucket:
+                rows = buffer.aggregate(bucket, start, end)
+                for row in rows:
+                    row["start"] = _iso(row["start"])
+                vehicles[vid] = {"bucket": bucket, "buckets": rows}
+            else:
+                rows = buffer.slice(start, end)
+                for row in rows:
+                    row["time"] = _iso(row["time"])
+                vehicles[vid] = {"samples": rows}
+    return {"vehicles": vehicles}
+
+
+@callback
+def async_setup_services(hass) -> None:
+    """Register the domain services once; they serve every config entry."""
+
+    async def _set_charging(call):
+        return await _handle_set_charging(hass, call)
+
+    async def _get_telemetry(call):
+        return await _handle_get_telemetry(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, "set_charging", _set_charging,
+        schema=SET_CHARGING_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, "get_telemetry", _get_telemetry,
+        schema=TELEMETRY_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    _LOGGER.debug("Services set_charging and get_telemetry registered")
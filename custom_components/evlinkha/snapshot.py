@@ -0,0 +1,90 @@
+# custom_components/evlinkha/snapshot.py
+
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_VERSION, SNAPSHOT_SAVE_DELAY
+from .model import StateNode, parse_status
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _compact(value):
+    """Drop None values recursively (a missing key reads back as None)."""
+    if isinstance(value, StateNode):
+        value = value.as_dict()
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items() if v is not None}
+    return value
+
+
+class SnapshotStore:
+    """
+    Last known vehicle and user data of one config entry, persisted in
+    .storage so the integration can start from it without waiting for
+    the API. Writes are debounced: at most one save per
+    SNAPSHOT_SAVE_DELAY seconds, plus a final write on shutdown.
+
+    Stored format: {"saved": epoch, "vehicles": {vehicle_id: status}, "user": userinfo,
+    "user_fetched": epoch, "static_fetched": {vehicle_id: epoch}}; the
+    *_fetched times keep the static tier's TTL running across restarts.
+    Vehicle statuses are stored as JSON and loaded back as VehicleState.
+    """
+
+    def __init__(self, hass, entry_id: str):
+        self._store = Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{entry_id}.snapshot", private=True)
+        self._vehicle_coord = None
+        self._user_coord = None
+
+    async def async_load(self) -> dict | None:
+        try:
+            data = await self._store.async_load()
+        except Exception:
+            _LOGGER.exception("Could not read EVLinkHA snapshot, starting without it")
+            return None
+        if not data or not data.get("vehicles"):
+            return None
+        _LOGGER.debug("Loaded EVLinkHA snapshot saved %.0f s ago", time.time() - data.get("saved", 0))
+        data["vehicles"] = {vid: parse_status(status) for vid, status in data["vehicles"].items()}
+        return data
+
+    @callback
+    def async_track(self, user_coord, vehicle_coord):
+        """
+        Save (debounced) whenever either coordinator publishes new data.
+        Returns a callable that stops tracking.
+        """
+        self._user_coord = user_coord
+        self._vehicle_coord = vehicle_coord
+        unsubs = [
+            user_coord.async_add_listener(self._async_schedule_save),
+            vehicle_coord.async_add_listener(self._async_schedule_save),
+        ]
+
+        @callback
+        def _untrack() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return _untrack
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        vehicles = (self._vehicle_coord.data if self._vehicle_coord else None) or {}
+        return {
+            "saved": time.time(),
+            "vehicles": {vid: _compact(status) for vid, status in vehicles.items() if status},
+            "user": _compact((self._user_coord.data if self._user_coord else None) or {}),
+            "user_fetched": self._user_coord.fetched_at if self._user_coord else None,
+            "static_fetched": dict(self._vehicle_coord.static_fetched) if self._vehicle_coord else {},
+        }
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
@@ -0,0 +1,199 @@
+# custom_components/evlinkha/telemetry.py
+
+import math
+import time
+from array import array
+
+from homeassistant.core import callback
+
+from .const import TELEMETRY_CAPACITY
+from .helpers.fields import FieldAccessor
+
+NAN = float("nan")
+
+# Numeric sample columns: name -> status path
+TELEMETRY_FIELDS = {
+    "batteryLevel": "chargeState.batteryLevel",
+    "chargeRate": "chargeState.chargeRate",
+    "range": "chargeState.range",
+    "odometer": "odometer.distance",
+}
+_ACCESSORS = tuple(FieldAccessor(path) for path in TELEMETRY_FIELDS.values())
+_IS_CHARGING = FieldAccessor("chargeState.isCharging")
+
+
+def _number(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return NAN
+    return float(value)
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)   # NaN == NaN for change detection
+
+
+def sample_from_status(status: dict | None) -> tuple[tuple[float, ...], int]:
+    """(numeric values in TELEMETRY_FIELDS order, isCharging as 1/0/-1 unknown)."""
+    # Through a float32 array, so values compare equal to what the buffer stores
+    values = tuple(array("f", (_number(acc(status)) for acc in _ACCESSORS)))
+    charging = _IS_CHARGING(status)
+    return values, -1 if charging is None else int(bool(charging))
+
+
+class TelemetryBuffer:
+    """
+    Fixed-size ring of telemetry samples for one vehicle.
+
+    Every column is a preallocated array (timestamps as doubles, values as
+    32-bit floats with NaN for unknown, isCharging as a signed byte), so
+    a full buffer costs about 25 bytes per sample and appending never
+    allocates. Timestamps never decrease, which keeps range lookups a
+    binary search.
+    """
+
+    __slots__ = ("capacity", "_time", "_values", "_charging", "_next", "_size")
+
+    def __init__(self, capacity: int = TELEMETRY_CAPACITY):
+        self.capacity = capacity
+        self._time = array("d", [0.0]) * capacity
+        self._values = tuple(array("f", [NAN]) * capacity for _ in TELEMETRY_FIELDS)
+        self._charging = array("b", [-1]) * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._time.itemsize * self.capacity
+            + sum(col.itemsize for col in self._values) * self.capacity
+            + self._charging.itemsize * self.capacity
+        )
+
+    def _physical(self, i: int) -> int:
+        """Ring position of the i-th oldest sample."""
+        return (self._next - self._size + i) % self.capacity
+
+    def append(self, ts: float, values: tuple[float, ...], charging: int) -> None:
+        if self._size:
+            ts = max(ts, self._time[self._physical(self._size - 1)])
+        pos = self._next
+        self._time[pos] = ts
+        for col, value in zip(self._values, values):
+            col[pos] = value
+        self._charging[pos] = charging
+        self._next = (pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def last(self) -> tuple[tuple[float, ...], int] | None:
+        if not self._size:
+            return None
+        pos = self._physical(self._size - 1)
+        return tuple(col[pos] for col in self._values), self._charging[pos]
+
+    def _bisect(self, ts: float) -> int:
+        """Index of the first sample at or after `ts`."""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time[self._physical(mid)] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, start: float | None, end: float | None) -> range:
+        first = 0 if start is None else self._bisect(start)
+        stop = self._size if end is None else self._bisect(end)
+        return range(first, stop)
+
+    def slice(self, start: float | None = None, end: float | None = None) -> list[dict]:
+        """Samples with start <= time < end, oldest first."""
+        out = []
+        for i in self._range(start, end):
+            pos = self._physical(i)
+            sample = {"time": self._time[pos]}
+            for name, col in zip(TELEMETRY_FIELDS, self._values):
+                value = col[pos]
+                sample[name] = None if math.isnan(value) else round(value, 3)
+            charging = self._charging[pos]
+            sample["isCharging"] = None if charging < 0 else bool(charging)
+            out.append(sample)
+        return out
+
+    def aggregate(self, bucket: float, start: float | None = None, end: float | None = None) -> list[dict]:
+        """
+        Downsample to fixed `bucket`-second windows: per field min/max/mean
+        of the known values, and the fraction of samples that were charging.
+        Empty windows are left out.
+        """
+        buckets: list[dict] = []
+        current = None
+        for i in self._range(start, end):
+            pos = self._physical(i)
+            ts = self._time[pos]
+            key = math.floor(ts / bucket) * bucket
+            if current is None or current[0] != key:
+                current = [key, 0, [[math.inf, -math.inf, 0.0, 0] for _ in TELEMETRY_FIELDS], 0, 0]
+                buckets.append(current)
+            current[1] += 1
+            for acc, col in zip(current[2], self._values):
+                value = col[pos]
+                if math.isnan(value):
+                    continue
+                acc[0] = min(acc[0], value)
+                acc[1] = max(acc[1], value)
+                acc[2] += value
+                acc[3] += 1
+            charging = self._charging[pos]
+            if charging >= 0:
+                current[3] += 1
+                current[4] += charging
+
+        out = []
+        for key, count, accs, known, charging in buckets:
+            row = {"start": key, "samples": count}
+            for name, (lo, hi, total, n) in zip(TELEMETRY_FIELDS, accs):
+                row[name] = (
+                    {"min": round(lo, 3), "max": round(hi, 3), "mean": round(total / n, 3)}
+                    if n else None
+                )
+            row["charging_fraction"] = round(charging / known, 3) if known else None
+            out.append(row)
+        return out
+
+
+class TelemetryRecorder:
+    """
+    Feeds one TelemetryBuffer per vehicle from the vehicle coordinator.
+
+    Polls and (coalesced) pushes both end in a coordinator update, so one
+    listener sees all of them. Only vehicles whose status object changed
+    are inspected, and a sample is only stored when one of its values
+    differs from the previous sample.
+    """
+
+    def __init__(self, coordinator, capacity: int = TELEMETRY_CAPACITY):
+        self.coordinator = coordinator
+        self.buffers = {vid: TelemetryBuffer(capacity) for vid in coordinator.vehicle_ids}
+        self._seen: dict[str, dict | None] = {}
+
+    @callback
+    def _async_record(self) -> None:
+        now = time.time()
+        for vid, buffer in self.buffers.items():
+            status = (self.coordinator.data or {}).get(vid)
+            if status is None or self._seen.get(vid) is status:
+                continue
+            self._seen[vid] = status
+            values, charging = sample_from_status(status)
+            last = buffer.last()
+            if last is not None and last[1] == charging and all(map(_same, last[0], values)):
+                continue
+            buffer.append(now, values, charging)
+
+    def async_track(self):
+        """Record every coordinator update; returns a callable that stops it."""
+        return self.coordinator.async_add_listener(self._async_record)